@@ -2,8 +2,10 @@ pub mod guard;
 pub mod evaluate;
 pub mod policy;
 pub mod auth;
+pub mod serve;
 
 pub use guard::GuardCommand;
 pub use evaluate::EvaluateCommand;
 pub use policy::PolicyCommand;
-pub use auth::AuthCommand;
\ No newline at end of file
+pub use auth::AuthCommand;
+pub use serve::ServeCommand;
\ No newline at end of file
@@ -0,0 +1,209 @@
+use clap::Args;
+use crate::config::Config;
+use crate::error::{Error, Result};
+use crate::evaluators::EvaluatorRegistry;
+use crate::models::{
+    EvaluationRequest, Policy, PolicyConfig, PolicyResult, PolicyType, ViolationSeverity
+};
+use chrono::Utc;
+use serde::{Deserialize, Serialize};
+use tokio::io::{AsyncBufReadExt, AsyncWriteExt, BufReader};
+use tracing::{info, error};
+
+/// Long-lived evaluator process for the API server. Reads one JSON request
+/// per line on stdin (a content and the policies to check it against) and
+/// writes one JSON response per line on stdout, so the server pays for
+/// process startup once and one round-trip per content.
+#[derive(Args)]
+pub struct ServeCommand {}
+
+#[derive(Debug, Deserialize)]
+struct ServeRequest {
+    id: u64,
+    content: String,
+    policies: Vec<ServePolicy>,
+    /// Stop at the first critical result; later policies are not evaluated
+    #[serde(default)]
+    stop_on_critical: bool,
+}
+
+#[derive(Debug, Deserialize)]
+struct ServePolicy {
+    policy_type: String,
+    config: serde_json::Value,
+}
+
+#[derive(Debug, Serialize)]
+struct ServeBatchResponse {
+    id: u64,
+    results: Vec<ServeResponse>,
+}
+
+/// Reply to a request that could not be parsed at all
+#[derive(Debug, Serialize)]
+struct ServeErrorResponse {
+    id: u64,
+    error: String,
+}
+
+#[derive(Debug, Serialize)]
+struct ServeResponse {
+    score: f64,
+    confidence: f64,
+    violation: bool,
+    details: serde_json::Value,
+    #[serde(skip_serializing_if = "Option::is_none")]
+    error: Option<String>,
+}
+
+impl ServePolicy {
+    fn policy_type(&self) -> Result<PolicyType> {
+        match self.policy_type.as_str() {
+            "keyword_filter" => Ok(PolicyType::KeywordFilter),
+            "performance" => Ok(PolicyType::Performance),
+            other => Err(Error::Evaluation(format!("Unsupported policy type: {}", other))),
+        }
+    }
+}
+
+impl ServeCommand {
+    pub async fn execute(&self, _config: &Config) -> Result<()> {
+        info!("Serving evaluations over stdin/stdout");
+
+        let registry = EvaluatorRegistry::new();
+        let mut lines = BufReader::new(tokio::io::stdin()).lines();
+        let mut stdout = tokio::io::stdout();
+
+        while let Some(line) = lines.next_line().await? {
+            if line.trim().is_empty() {
+                continue;
+            }
+
+            let mut out = match serde_json::from_str::<ServeRequest>(&line) {
+                Ok(request) => serde_json::to_vec(&evaluate_batch(&registry, request).await)?,
+                Err(e) => {
+                    error!("Malformed evaluation request: {}", e);
+                    // Reply when the id can still be read, so the caller fails
+                    // that request instead of waiting on it; without one there
+                    // is nothing to match the reply to
+                    match request_id(&line) {
+                        Some(id) => serde_json::to_vec(&ServeErrorResponse {
+                            id,
+                            error: format!("Malformed evaluation request: {}", e),
+                        })?,
+                        None => continue,
+                    }
+                }
+            };
+
+            out.push(b'\n');
+            stdout.write_all(&out).await?;
+            stdout.flush().await?;
+        }
+
+        Ok(())
+    }
+}
+
+/// The id of a request line that failed to parse as a ServeRequest
+fn request_id(line: &str) -> Option<u64> {
+    serde_json::from_str::<serde_json::Value>(line)
+        .ok()?
+        .get("id")?
+        .as_u64()
+}
+
+/// Evaluate every policy of a request against its content, which is sent and
+/// parsed once for the whole batch
+async fn evaluate_batch(registry: &EvaluatorRegistry, request: ServeRequest) -> ServeBatchResponse {
+    let evaluation = EvaluationRequest {
+        id: request.id.to_string(),
+        content: request.content,
+        context: None,
+        policies: Vec::new(),
+        metadata: None,
+    };
+
+    let mut results = Vec::with_capacity(request.policies.len());
+    for (index, policy) in request.policies.into_iter().enumerate() {
+        let response = evaluate(registry, &evaluation, index, policy)
+            .await
+            .unwrap_or_else(ServeResponse::failed);
+        let critical = response.is_critical();
+        results.push(response);
+
+        if request.stop_on_critical && critical {
+            break;
+        }
+    }
+
+    ServeBatchResponse { id: request.id, results }
+}
+
+async fn evaluate(
+    registry: &EvaluatorRegistry,
+    evaluation: &EvaluationRequest,
+    index: usize,
+    policy: ServePolicy,
+) -> Result<ServeResponse> {
+    let policy_type = policy.policy_type()?;
+    let config: PolicyConfig = serde_json::from_value(policy.config)?;
+
+    let policy = Policy {
+        id: index.to_string(),
+        name: policy.policy_type,
+        description: None,
+        policy_type,
+        config,
+        enabled: true,
+        organization_id: String::new(),
+        created_at: Utc::now(),
+        updated_at: Utc::now(),
+        created_by: String::new(),
+    };
+
+    let result = registry.evaluate(evaluation, &policy).await?;
+    Ok(ServeResponse::from_result(result.result))
+}
+
+impl ServeResponse {
+    fn from_result(result: PolicyResult) -> Self {
+        match result {
+            PolicyResult::Pass => Self {
+                score: 1.0,
+                confidence: 1.0,
+                violation: false,
+                details: serde_json::json!({}),
+                error: None,
+            },
+            PolicyResult::Violation { severity, message, confidence, details } => Self {
+                score: match severity {
+                    ViolationSeverity::Critical => 0.0,
+                    ViolationSeverity::High => 0.2,
+                    ViolationSeverity::Medium => 0.5,
+                    ViolationSeverity::Low => 0.8,
+                },
+                confidence,
+                violation: true,
+                details: details.unwrap_or_else(|| serde_json::json!({ "message": message })),
+                error: None,
+            },
+            PolicyResult::Error { message } => Self::failed(Error::Evaluation(message)),
+        }
+    }
+
+    fn failed(error: Error) -> Self {
+        Self {
+            score: 1.0,
+            confidence: 0.0,
+            violation: false,
+            details: serde_json::json!({}),
+            error: Some(error.to_string()),
+        }
+    }
+
+    /// Same rule the server uses to block early: a violation scoring below 0.3
+    fn is_critical(&self) -> bool {
+        self.violation && self.score < 0.3
+    }
+}
@@ -5,14 +5,23 @@ use crate::models::{
 };
 use crate::error::Result;
 use async_trait::async_trait;
-use regex::Regex;
+use regex::{Regex, RegexBuilder, RegexSet, RegexSetBuilder};
 use chrono::Utc;
 use uuid::Uuid;
+use std::sync::Arc;
 use std::time::Instant;
 
+/// All patterns of one policy, compiled once. The set finds every matching
+/// pattern in a single pass; the individual regexes are only run for the
+/// patterns the set reported, to extract the matched text.
+struct CompiledPatterns {
+    set: RegexSet,
+    regexes: Vec<Regex>,
+}
+
 pub struct KeywordFilterEvaluator {
-    // Cache compiled regexes for performance
-    regex_cache: dashmap::DashMap<String, Regex>,
+    // Cache compiled pattern sets for performance
+    regex_cache: dashmap::DashMap<String, Arc<CompiledPatterns>>,
 }
 
 impl KeywordFilterEvaluator {
@@ -22,22 +31,24 @@ impl KeywordFilterEvaluator {
         }
     }
     
-    fn get_or_compile_regex(&self, pattern: &str, case_sensitive: bool) -> Result<Regex> {
-        let cache_key = format!("{}:{}", pattern, case_sensitive);
+    fn get_or_compile_patterns(&self, patterns: &[String], case_sensitive: bool) -> Result<Arc<CompiledPatterns>> {
+        let cache_key = format!("{}:{}", case_sensitive, patterns.join("\u{1f}"));
         
-        if let Some(regex) = self.regex_cache.get(&cache_key) {
-            return Ok(regex.clone());
+        if let Some(compiled) = self.regex_cache.get(&cache_key) {
+            return Ok(compiled.clone());
         }
         
-        let regex_pattern = if case_sensitive {
-            pattern.to_string()
-        } else {
-            format!("(?i){}", pattern)
-        };
+        let set = RegexSetBuilder::new(patterns)
+            .case_insensitive(!case_sensitive)
+            .build()?;
+        let regexes = patterns
+            .iter()
+            .map(|pattern| RegexBuilder::new(pattern).case_insensitive(!case_sensitive).build())
+            .collect::<std::result::Result<Vec<_>, _>>()?;
         
-        let regex = Regex::new(&regex_pattern)?;
-        self.regex_cache.insert(cache_key, regex.clone());
-        Ok(regex)
+        let compiled = Arc::new(CompiledPatterns { set, regexes });
+        self.regex_cache.insert(cache_key, compiled.clone());
+        Ok(compiled)
     }
 }
 
@@ -53,14 +64,12 @@ impl Evaluator for KeywordFilterEvaluator {
             )),
         };
         
+        let compiled = self.get_or_compile_patterns(&config.patterns, config.case_sensitive)?;
         let mut violations = Vec::new();
         
-        for pattern in &config.patterns {
-            let regex = self.get_or_compile_regex(pattern, config.case_sensitive)?;
-            
-            if let Some(captures) = regex.captures(&request.content) {
-                let matched_text = captures.get(0).unwrap().as_str();
-                violations.push(format!("Pattern '{}' matched: '{}'", pattern, matched_text));
+        for index in compiled.set.matches(&request.content).iter() {
+            if let Some(found) = compiled.regexes[index].find(&request.content) {
+                violations.push(format!("Pattern '{}' matched: '{}'", config.patterns[index], found.as_str()));
             }
         }
         
@@ -1,7 +1,7 @@
 use clap::{Parser, Subcommand};
 use sentinelai_core::{
     auth::AuthManager,
-    cli::{GuardCommand, EvaluateCommand, PolicyCommand, AuthCommand},
+    cli::{GuardCommand, EvaluateCommand, PolicyCommand, AuthCommand, ServeCommand},
     config::Config,
     error::Result,
 };
@@ -33,14 +33,17 @@ enum Commands {
     Policy(PolicyCommand),
     /// User authentication
     Auth(AuthCommand),
+    /// Evaluate JSON-lines requests from stdin for the API server
+    Serve(ServeCommand),
 }
 
 #[tokio::main]
 async fn main() -> Result<()> {
     let cli = Cli::parse();
     
-    // Initialize tracing
+    // Initialize tracing; logs go to stderr so stdout stays free for `serve`
     let subscriber = tracing_subscriber::fmt()
+        .with_writer(std::io::stderr)
         .with_max_level(if cli.verbose { 
             tracing::Level::DEBUG 
         } else { 
@@ -60,5 +63,6 @@ async fn main() -> Result<()> {
         Commands::Evaluate(cmd) => cmd.execute(&config).await,
         Commands::Policy(cmd) => cmd.execute(&config).await,
         Commands::Auth(cmd) => cmd.execute(&config).await,
+        Commands::Serve(cmd) => cmd.execute(&config).await,
     }
 }
\ No newline at end of file
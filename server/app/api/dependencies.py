@@ -1,7 +1,10 @@
-from fastapi import HTTPException, Depends, Header
+from fastapi import HTTPException, Depends, Header, Request
 from typing import Optional
+from cachetools import TTLCache
+import hashlib
 import jwt
 import os
+import time
 import logging
 
 logger = logging.getLogger(__name__)
@@ -10,6 +13,10 @@ logger = logging.getLogger(__name__)
 JWT_SECRET = os.getenv("JWT_SECRET", "your-secret-key")
 JWT_ALGORITHM = "HS256"
 
+# Verified tokens keyed by SHA-256(token) -> (user, exp). The short TTL bounds
+# how long a revoked token keeps being accepted.
+_token_cache: TTLCache = TTLCache(maxsize=10000, ttl=5)
+
 async def get_current_user(authorization: Optional[str] = Header(None)) -> dict:
     """Extract and validate user from JWT token"""
     if not authorization:
@@ -18,6 +25,15 @@ async def get_current_user(authorization: Optional[str] = Header(None)) -> dict:
     try:
         # Extract token from "Bearer <token>"
         token = authorization.replace("Bearer ", "")
+        cache_key = hashlib.sha256(token.encode()).digest()
+        
+        cached = _token_cache.get(cache_key)
+        if cached:
+            user, exp = cached
+            if exp is None or exp > time.time():
+                return user
+            _token_cache.pop(cache_key, None)
+        
         payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
         
         # Mock user data - in production, fetch from database
@@ -29,6 +45,7 @@ async def get_current_user(authorization: Optional[str] = Header(None)) -> dict:
             "role": payload.get("role", "admin")
         }
         
+        _token_cache[cache_key] = (user, payload.get("exp"))
         return user
         
     except jwt.InvalidTokenError:
@@ -45,4 +62,13 @@ async def require_admin_role(current_user: dict = Depends(get_current_user)):
     """Require admin role for certain operations"""
     if current_user.get("role") != "admin":
         raise HTTPException(status_code=403, detail="Admin role required")
-    return current_user
\ No newline at end of file
+    return current_user
+
+# Async so FastAPI resolves these on the event loop instead of a threadpool hop
+async def get_policy_engine(request: Request):
+    """Return the PolicyEngine created at application startup"""
+    return request.app.state.policy_engine
+
+async def get_llm_proxy(request: Request):
+    """Return the LLMProxyService created at application startup"""
+    return request.app.state.llm_proxy
\ No newline at end of file
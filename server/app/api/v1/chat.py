@@ -4,14 +4,20 @@ Chat completions API with real-time policy enforcement
 
 import asyncio
 import time
-from typing import Dict, Any, Optional, List, AsyncGenerator
+from concurrent.futures import Executor
+from functools import lru_cache
+from typing import Dict, Any, Optional, List, AsyncGenerator, Set
 import structlog
-from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi import APIRouter, HTTPException, Depends, Request, BackgroundTasks
 from fastapi.responses import StreamingResponse
-import httpx
+import orjson
+import tiktoken
+import xxhash
+from cachetools import TTLCache
 
 from app.core.config import get_settings
 from app.core.auth import get_current_user
+from app.api.dependencies import get_policy_engine, get_llm_proxy
 from app.models.chat import ChatCompletionRequest, ChatCompletionResponse
 from app.models.user import User
 from app.services.policy_engine import PolicyEngine
@@ -21,10 +27,75 @@ from app.core.metrics import chat_requests_total, chat_request_duration
 logger = structlog.get_logger()
 router = APIRouter()
 
+# Characters of already-checked output carried into each streaming check so
+# that matches spanning a chunk boundary are not missed
+_STREAM_SCAN_OVERLAP = 256
+
+# Streamed output is checked every this many tokens
+_STREAM_CHECK_TOKENS = 64
+
+@lru_cache(maxsize=64)
+def _encoding_for_model(model: str):
+    """Tokenizer used to pace streaming checks; unknown models use cl100k_base"""
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+def preload_encodings():
+    """Load the default tokenizer ahead of the first stream; tiktoken
+    downloads and parses the BPE ranks on first use"""
+    _encoding_for_model("gpt-4")
+
+# Server-sent event framing, pre-encoded once
+_SSE_PREFIX = b"data: "
+_SSE_SUFFIX = b"\n\n"
+_ERR_FRAME = b'data: {"error":"Stream terminated due to policy violation"}\n\n'
+
+@lru_cache(maxsize=4096)
+def _requests_counter(organization: str, model: str, status: str):
+    """Label-bound chat_requests_total child, reused across requests"""
+    return chat_requests_total.labels(organization=organization, model=model, status=status)
+
+@lru_cache(maxsize=4096)
+def _duration_histogram(organization: str, model: str):
+    """Label-bound chat_request_duration child, reused across requests"""
+    return chat_request_duration.labels(organization=organization, model=model)
+
+# Chained hashes of conversation prefixes that already passed pre-request
+# evaluation, so follow-up turns only re-check the new messages
+_cleared_prefixes: TTLCache = TTLCache(maxsize=10000, ttl=300)
+
+def _prefix_hashes(organization_id: str, policies: List[Any], contents: List[str]) -> List[int]:
+    """Hash every message prefix in one pass; hashes[i] covers contents[:i + 1]"""
+    digest = xxhash.xxh3_64()
+    digest.update(organization_id.encode())
+    # updated_at changes on every policy edit (version is never bumped), so an
+    # edited policy invalidates every prefix cleared under its old config
+    digest.update(repr([(str(p.id), p.updated_at) for p in policies]).encode())
+    
+    hashes = []
+    for text in contents:
+        digest.update(text.encode())
+        digest.update(b"\0")
+        hashes.append(digest.intdigest())
+    return hashes
+
+def _content_to_evaluate(contents: List[str], hashes: List[int]) -> str:
+    """Join the messages after the longest cleared prefix, keeping a bounded overlap"""
+    for start in range(len(contents) - 1, 0, -1):
+        if hashes[start - 1] in _cleared_prefixes:
+            overlap = contents[start - 1][-_STREAM_SCAN_OVERLAP:]
+            return " ".join([overlap, *contents[start:]])
+    return " ".join(contents)
+
 @router.post("/completions")
 async def create_chat_completion(
     request: ChatCompletionRequest,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
+    policy_engine: PolicyEngine = Depends(get_policy_engine),
+    llm_proxy: LLMProxyService = Depends(get_llm_proxy),
     http_request: Request = None
 ) -> ChatCompletionResponse:
     """
@@ -36,18 +107,15 @@ async def create_chat_completion(
     start_time = time.time()
     
     try:
-        # Initialize services
         settings = get_settings()
-        policy_engine = PolicyEngine()
-        llm_proxy = LLMProxyService()
         
         # Get organization policies
         policies = await policy_engine.get_active_policies(current_user.organization_id)
         
-        # Extract content for evaluation
-        content = ""
-        if request.messages:
-            content = " ".join([msg.content for msg in request.messages if msg.content])
+        # Extract content for evaluation, skipping turns already cleared
+        contents = [msg.content for msg in request.messages if msg.content] if request.messages else []
+        prefix_hashes = _prefix_hashes(current_user.organization_id, policies, contents)
+        content = _content_to_evaluate(contents, prefix_hashes)
         
         # Pre-request policy evaluation (fast evaluators only)
         pre_evaluation_start = time.time()
@@ -67,28 +135,28 @@ async def create_chat_completion(
         )
         
         # Early exit if critical violations found
-        critical_violations = [v for v in pre_violations if v.result.severity == "CRITICAL"]
+        critical_violations = [
+            {
+                "policy": v.policy_name,
+                "message": v.result.message,
+                "severity": v.result.severity
+            }
+            for v in pre_violations if v.result.severity == "CRITICAL"
+        ]
         if critical_violations:
-            chat_requests_total.labels(
-                organization=current_user.organization_id,
-                model=request.model,
-                status="blocked"
-            ).inc()
+            _requests_counter(current_user.organization_id, request.model, "blocked").inc()
             
             raise HTTPException(
                 status_code=400,
                 detail={
                     "error": "Request blocked by policy",
-                    "violations": [
-                        {
-                            "policy": v.policy_name,
-                            "message": v.result.message,
-                            "severity": v.result.severity
-                        } for v in critical_violations
-                    ]
+                    "violations": critical_violations
                 }
             )
         
+        if prefix_hashes:
+            _cleared_prefixes[prefix_hashes[-1]] = True
+        
         # Forward request to LLM provider
         llm_start_time = time.time()
         
@@ -96,9 +164,10 @@ async def create_chat_completion(
             # Handle streaming response
             return StreamingResponse(
                 _stream_with_policy_check(
-                    request, current_user, policies, llm_proxy, policy_engine
+                    request, current_user, policies, llm_proxy, policy_engine,
+                    http_request.app.state.eval_pool, http_request.app.state.pending_tasks
                 ),
-                media_type="text/plain"
+                media_type="text/event-stream"
             )
         else:
             # Handle non-streaming response
@@ -109,30 +178,23 @@ async def create_chat_completion(
             if response.choices and response.choices[0].message:
                 response_content = response.choices[0].message.content
                 
-                # Run comprehensive evaluation in background
-                asyncio.create_task(
-                    _evaluate_response_comprehensive(
-                        content=response_content,
-                        policies=policies,
-                        user_id=current_user.id,
-                        organization_id=current_user.organization_id,
-                        request_id=response.id,
-                        policy_engine=policy_engine
-                    )
+                # Run comprehensive evaluation after the response is sent
+                background_tasks.add_task(
+                    _evaluate_response_comprehensive,
+                    content=response_content,
+                    policies=policies,
+                    user_id=current_user.id,
+                    organization_id=current_user.organization_id,
+                    request_id=response.id,
+                    policy_engine=policy_engine,
+                    eval_pool=http_request.app.state.eval_pool
                 )
             
             # Record metrics
             total_time = (time.time() - start_time) * 1000
-            chat_requests_total.labels(
-                organization=current_user.organization_id,
-                model=request.model,
-                status="success"
-            ).inc()
+            _requests_counter(current_user.organization_id, request.model, "success").inc()
             
-            chat_request_duration.labels(
-                organization=current_user.organization_id,
-                model=request.model
-            ).observe(total_time / 1000)
+            _duration_histogram(current_user.organization_id, request.model).observe(total_time / 1000)
             
             logger.info(
                 "Chat completion successful",
@@ -150,11 +212,7 @@ async def create_chat_completion(
     except Exception as e:
         logger.error("Chat completion failed", error=str(e), user_id=current_user.id)
         
-        chat_requests_total.labels(
-            organization=current_user.organization_id,
-            model=request.model,
-            status="error"
-        ).inc()
+        _requests_counter(current_user.organization_id, request.model, "error").inc()
         
         raise HTTPException(
             status_code=500,
@@ -166,59 +224,86 @@ async def _stream_with_policy_check(
     user: User,
     policies: List[Any],
     llm_proxy: LLMProxyService,
-    policy_engine: PolicyEngine
-) -> AsyncGenerator[str, None]:
+    policy_engine: PolicyEngine,
+    eval_pool: Optional[Executor],
+    pending_tasks: Set[asyncio.Task]
+) -> AsyncGenerator[bytes, None]:
     """Stream response with real-time policy checking"""
     
-    accumulated_content = ""
-    chunk_count = 0
+    content_parts: List[str] = []
+    scan_tail = ""
+    unchecked = ""
+    tokens_since_last_check = 0
+    
+    async def window_is_blocked(text: str) -> bool:
+        # Check the text plus a bounded tail of earlier output, so total scan
+        # cost stays linear in stream length
+        nonlocal scan_tail
+        window = scan_tail + text
+        violations = await policy_engine.evaluate_fast(
+            content=window,
+            policies=policies,
+            user_id=user.id,
+            organization_id=user.organization_id
+        )
+        scan_tail = window[-_STREAM_SCAN_OVERLAP:]
+        return any(v.result.severity == "CRITICAL" for v in violations)
     
     try:
+        # A model not seen before may load a tokenizer from disk or the network
+        encoding = await asyncio.to_thread(_encoding_for_model, request.model)
+        
         async for chunk in llm_proxy.create_completion_stream(request):
-            chunk_count += 1
-            
             # Extract content from chunk
             if hasattr(chunk, 'choices') and chunk.choices:
                 delta = chunk.choices[0].delta
                 if hasattr(delta, 'content') and delta.content:
-                    accumulated_content += delta.content
+                    content_parts.append(delta.content)
+                    unchecked += delta.content
+                    tokens_since_last_check += len(encoding.encode(delta.content, disallowed_special=()))
                     
-                    # Periodic policy checking (every 10 chunks or 100 characters)
-                    if chunk_count % 10 == 0 or len(accumulated_content) % 100 == 0:
-                        violations = await policy_engine.evaluate_fast(
-                            content=accumulated_content,
-                            policies=policies,
-                            user_id=user.id,
-                            organization_id=user.organization_id
-                        )
+                    # Check every _STREAM_CHECK_TOKENS tokens, up to the last word
+                    # boundary so a partial word waits for the next check
+                    if tokens_since_last_check >= _STREAM_CHECK_TOKENS:
+                        boundary = unchecked.rfind(" ") + 1 or len(unchecked)
+                        text, unchecked = unchecked[:boundary], unchecked[boundary:]
+                        tokens_since_last_check = 0
                         
-                        # Check for critical violations
-                        critical_violations = [v for v in violations if v.result.severity == "CRITICAL"]
-                        if critical_violations:
+                        if await window_is_blocked(text):
                             # Send termination chunk
-                            yield f"data: {{'error': 'Stream terminated due to policy violation'}}\n\n"
+                            yield _ERR_FRAME
                             return
             
             # Forward chunk to client
-            yield f"data: {chunk.model_dump_json()}\n\n"
+            yield _SSE_PREFIX + orjson.dumps(chunk.model_dump()) + _SSE_SUFFIX
+        
+        # Check whatever arrived after the last checkpoint
+        if unchecked and await window_is_blocked(unchecked):
+            yield _ERR_FRAME
             
     except Exception as e:
         logger.error("Streaming failed", error=str(e), user_id=user.id)
-        yield f"data: {{'error': 'Stream error: {str(e)}'}}\n\n"
+        yield _SSE_PREFIX + orjson.dumps({"error": f"Stream error: {str(e)}"}) + _SSE_SUFFIX
     
     finally:
         # Final comprehensive evaluation
+        accumulated_content = "".join(content_parts)
         if accumulated_content:
-            asyncio.create_task(
+            # The response is already streaming, so keep a reference to the
+            # task until it finishes instead of using BackgroundTasks
+            task = asyncio.create_task(
                 _evaluate_response_comprehensive(
                     content=accumulated_content,
                     policies=policies,
                     user_id=user.id,
                     organization_id=user.organization_id,
                     request_id=f"stream_{int(time.time())}",
-                    policy_engine=policy_engine
+                    policy_engine=policy_engine,
+                    eval_pool=eval_pool
                 )
             )
+            pending_tasks.add(task)
+            task.add_done_callback(pending_tasks.discard)
 
 async def _evaluate_response_comprehensive(
     content: str,
@@ -226,16 +311,30 @@ async def _evaluate_response_comprehensive(
     user_id: str,
     organization_id: str,
     request_id: str,
-    policy_engine: PolicyEngine
+    policy_engine: PolicyEngine,
+    eval_pool: Optional[Executor]
 ):
     """Run comprehensive policy evaluation in background"""
     try:
-        violations = await policy_engine.evaluate_comprehensive(
-            content=content,
-            policies=policies,
-            user_id=user_id,
-            organization_id=organization_id
-        )
+        if eval_pool is None:
+            violations = await policy_engine.evaluate_comprehensive(
+                content=content,
+                policies=policies,
+                user_id=user_id,
+                organization_id=organization_id
+            )
+        else:
+            # The heavy evaluators run in the process pool so they do not compete
+            # with request handling for this event loop
+            loop = asyncio.get_running_loop()
+            violations = await loop.run_in_executor(
+                eval_pool,
+                _run_comprehensive_sync,
+                content,
+                policies,
+                user_id,
+                organization_id
+            )
         
         if violations:
             logger.warning(
@@ -257,4 +356,31 @@ async def _evaluate_response_comprehensive(
             error=str(e),
             user_id=user_id,
             request_id=request_id
-        )
\ No newline at end of file
+        )
+
+# Per-process state of the comprehensive evaluation workers
+_worker_policy_engine: Optional[PolicyEngine] = None
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+
+def init_eval_worker():
+    """Process pool initializer: load the evaluators once per worker"""
+    global _worker_policy_engine, _worker_loop
+    _worker_policy_engine = PolicyEngine()
+    _worker_loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(_worker_loop)
+
+def _run_comprehensive_sync(
+    content: str,
+    policies: List[Any],
+    user_id: str,
+    organization_id: str
+) -> List[Any]:
+    """Run comprehensive evaluation inside a pool worker"""
+    return _worker_loop.run_until_complete(
+        _worker_policy_engine.evaluate_comprehensive(
+            content=content,
+            policies=policies,
+            user_id=user_id,
+            organization_id=organization_id
+        )
+    )
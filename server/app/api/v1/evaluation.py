@@ -1,22 +1,42 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import ORJSONResponse
 from typing import List, Optional
+import asyncio
 import logging
+import msgspec
 
-from ...models.evaluation import EvaluationRequest, EvaluationResult
-from ...services.evaluation_service import evaluation_service
+from ...core.config import get_settings
+from ...models.evaluation import EvaluationRequest, EvaluationResult, EvaluationStatus
+from ...services.evaluation_service import evaluation_service, new_request_id
 from ..dependencies import get_current_user, get_organization_id
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/evaluation", tags=["evaluation"])
 
-class EvaluateRequest:
-    def __init__(self, content: str, policy_ids: Optional[List[str]] = None):
-        self.content = content
-        self.policy_ids = policy_ids or []
+# Caps evaluations in flight across all batch requests
+_evaluation_semaphore = asyncio.Semaphore(get_settings().MAX_CONCURRENT_EVALUATIONS)
+
+class EvaluateRequest(msgspec.Struct):
+    content: str
+    policy_ids: List[str] = []
+
+def _decode_body(body: bytes, body_type):
+    try:
+        return msgspec.json.decode(body, type=body_type)
+    except (msgspec.ValidationError, msgspec.DecodeError) as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+async def parse_evaluate_request(request: Request) -> EvaluateRequest:
+    """Decode and validate the request body with msgspec"""
+    return _decode_body(await request.body(), EvaluateRequest)
+
+async def parse_evaluate_batch(request: Request) -> List[EvaluateRequest]:
+    """Decode and validate a batch request body with msgspec"""
+    return _decode_body(await request.body(), List[EvaluateRequest])
 
 @router.post("/evaluate", response_model=EvaluationResult)
 async def evaluate_content(
-    request: EvaluateRequest,
+    request: EvaluateRequest = Depends(parse_evaluate_request),
     current_user: dict = Depends(get_current_user),
     organization_id: str = Depends(get_organization_id)
 ):
@@ -28,29 +48,53 @@ async def evaluate_content(
             user_id=current_user["id"],
             policy_ids=request.policy_ids
         )
-        return result
+        # Serialized by pydantic-core and orjson, skipping response_model revalidation
+        return ORJSONResponse(result.model_dump(mode="json"))
     except Exception as e:
         logger.error(f"Failed to evaluate content: {e}")
         raise HTTPException(status_code=500, detail="Failed to evaluate content")
 
 @router.post("/batch", response_model=List[EvaluationResult])
 async def evaluate_batch(
-    requests: List[EvaluateRequest],
+    requests: List[EvaluateRequest] = Depends(parse_evaluate_batch),
     current_user: dict = Depends(get_current_user),
     organization_id: str = Depends(get_organization_id)
 ):
     """Evaluate multiple content items in batch"""
-    try:
-        results = []
-        for request in requests:
-            result = await evaluation_service.evaluate_content(
+    async def evaluate_one(request: EvaluateRequest) -> EvaluationResult:
+        async with _evaluation_semaphore:
+            return await evaluation_service.evaluate_content(
                 content=request.content,
                 organization_id=organization_id,
                 user_id=current_user["id"],
                 policy_ids=request.policy_ids
             )
-            results.append(result)
-        return results
+    
+    try:
+        outcomes = await asyncio.gather(
+            *(evaluate_one(request) for request in requests),
+            return_exceptions=True
+        )
+        
+        # A failed item gets a FAILED result instead of failing the whole batch
+        results = []
+        for index, outcome in enumerate(outcomes):
+            if isinstance(outcome, BaseException) and not isinstance(outcome, Exception):
+                # Cancellation or shutdown of an item is not an item failure
+                raise outcome
+            if isinstance(outcome, Exception):
+                logger.error(f"Failed to evaluate batch item {index}: {outcome}")
+                outcome = EvaluationResult(
+                    request_id=new_request_id(),
+                    status=EvaluationStatus.FAILED,
+                    overall_score=1.0,
+                    has_violations=False,
+                    total_execution_time_ms=0.0,
+                    # The cause stays in the log, as for a failed single evaluation
+                    error_message=f"Failed to evaluate batch item {index}"
+                )
+            results.append(outcome.model_dump(mode="json"))
+        return ORJSONResponse(results)
     except Exception as e:
         logger.error(f"Failed to evaluate batch: {e}")
         raise HTTPException(status_code=500, detail="Failed to evaluate batch")
\ No newline at end of file
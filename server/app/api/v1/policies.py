@@ -1,14 +1,31 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from typing import List, Optional
 import logging
+import orjson
 
-from ...models.policy import Policy, PolicyCreate, PolicyUpdate, PolicyStatus, PolicyType
-from ...services.policy_service import policy_service
+from ...core.cache import cache_get, cache_set, versioned_policy_cache_key, POLICY_CACHE_TTL_SECONDS
+from ...models.policy import (
+    BulkPolicyResult,
+    Policy,
+    PolicyCreate,
+    PolicyUpdate,
+    PolicyStatus,
+    PolicyType,
+    PolicySummary
+)
+from ...services.policy_service import policy_service, encode_policy_cursor, decode_policy_cursor
 from ..dependencies import get_current_user, get_organization_id
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/policies", tags=["policies"])
 
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+
+# Policies accepted by one bulk create request
+MAX_BULK_POLICIES = 500
+
 @router.post("/", response_model=Policy)
 async def create_policy(
     policy_data: PolicyCreate,
@@ -22,33 +39,124 @@ async def create_policy(
             organization_id=organization_id,
             user_id=current_user["id"]
         )
-        return policy
+        return ORJSONResponse(policy.model_dump(mode="json"))
     except Exception as e:
         logger.error(f"Failed to create policy: {e}")
         raise HTTPException(status_code=500, detail="Failed to create policy")
 
-@router.get("/", response_model=List[Policy])
+@router.post("/bulk", response_model=BulkPolicyResult, responses={207: {"model": BulkPolicyResult}})
+async def bulk_create_policies(
+    policies_data: List[PolicyCreate],
+    current_user: dict = Depends(get_current_user),
+    organization_id: str = Depends(get_organization_id)
+):
+    """Create many policies in one request, e.g. when provisioning an organization.
+
+    Responds 207 when some policies were rejected; they are listed in errors
+    by their index in the request, and the others are created regardless.
+    """
+    if len(policies_data) > MAX_BULK_POLICIES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_POLICIES} policies per request")
+    
+    try:
+        result = await policy_service.bulk_create_policies(
+            policies_data=policies_data,
+            organization_id=organization_id,
+            user_id=current_user["id"]
+        )
+        return ORJSONResponse(result.model_dump(mode="json"), status_code=207 if result.errors else 200)
+    except Exception as e:
+        logger.error(f"Failed to create policies: {e}")
+        raise HTTPException(status_code=500, detail="Failed to create policies")
+
+@router.get("/", response_model=List[PolicySummary])
 async def list_policies(
     status: Optional[PolicyStatus] = Query(None),
     policy_type: Optional[PolicyType] = Query(None),
-    skip: int = Query(0, ge=0),
+    after: Optional[str] = Query(None, description="Page cursor from the previous page's X-Next-Cursor header"),
+    page: Optional[int] = Query(None, ge=1, description="Page number; returns the total in X-Total-Count instead of a cursor"),
     limit: int = Query(100, ge=1, le=1000),
+    skip: Optional[int] = Query(None, include_in_schema=False),
     organization_id: str = Depends(get_organization_id)
 ):
-    """List policies with optional filtering"""
+    """List policies with optional filtering, paginated by cursor or page number"""
+    if skip is not None:
+        # Offset paging was replaced by cursors; ignoring skip would silently
+        # return the first page for every request of an old client
+        raise HTTPException(status_code=422, detail="skip is no longer supported; use after or page")
+    if after and page:
+        raise HTTPException(status_code=400, detail="Use either after or page, not both")
     try:
-        policies = await policy_service.list_policies(
-            organization_id=organization_id,
-            status=status,
-            policy_type=policy_type.value if policy_type else None,
-            skip=skip,
-            limit=limit
+        page_after = decode_policy_cursor(after) if after else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # The first line of a cached entry is the value of this header
+    header = TOTAL_COUNT_HEADER if page else NEXT_CURSOR_HEADER
+    
+    try:
+        cache_key = await versioned_policy_cache_key(
+            organization_id, "set", "list",
+            status.value if status else "", policy_type.value if policy_type else "",
+            after or "", page or "", limit
         )
-        return policies
+        # Cached as "<header value>\n<body>"; orjson output has no raw newlines
+        cached = await cache_get(cache_key)
+        if cached:
+            header_value, _, body = cached.partition("\n")
+            headers = {header: header_value} if header_value else None
+            return Response(content=body, media_type="application/json", headers=headers)
+        
+        if page:
+            policies, total = await policy_service.list_policy_summaries_with_total(
+                organization_id=organization_id,
+                status=status,
+                policy_type=policy_type.value if policy_type else None,
+                page=page,
+                limit=limit
+            )
+            header_value = str(total)
+        else:
+            policies, next_page = await policy_service.list_policy_summaries(
+                organization_id=organization_id,
+                status=status,
+                policy_type=policy_type.value if policy_type else None,
+                after=page_after,
+                limit=limit
+            )
+            header_value = encode_policy_cursor(next_page) if next_page else ""
+        
+        # Encoded once for both the cache and the response
+        body = orjson.dumps([p.model_dump(mode="json") for p in policies]).decode()
+        await cache_set(cache_key, header_value + "\n" + body, POLICY_CACHE_TTL_SECONDS)
+        
+        headers = {header: header_value} if header_value else None
+        return Response(content=body, media_type="application/json", headers=headers)
     except Exception as e:
         logger.error(f"Failed to list policies: {e}")
         raise HTTPException(status_code=500, detail="Failed to list policies")
 
+@router.get("/stream")
+async def stream_policies(
+    status: Optional[PolicyStatus] = Query(None),
+    policy_type: Optional[PolicyType] = Query(None),
+    organization_id: str = Depends(get_organization_id)
+):
+    """Stream all matching policy summaries as newline-delimited JSON"""
+    async def lines():
+        try:
+            async for line in policy_service.stream_policy_summaries(
+                organization_id=organization_id,
+                status=status,
+                policy_type=policy_type.value if policy_type else None
+            ):
+                yield line
+        except Exception as e:
+            # Headers are already sent; the client sees a truncated stream
+            logger.error(f"Failed to stream policies: {e}")
+    
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
 @router.get("/{policy_id}", response_model=Policy)
 async def get_policy(
     policy_id: str,
@@ -56,10 +164,11 @@ async def get_policy(
 ):
     """Get a specific policy"""
     try:
-        policy = await policy_service.get_policy(policy_id, organization_id)
-        if not policy:
+        # One Redis lookup; hits are returned as stored
+        policy_json = await policy_service.get_policy_json(policy_id, organization_id)
+        if not policy_json:
             raise HTTPException(status_code=404, detail="Policy not found")
-        return policy
+        return Response(content=policy_json, media_type="application/json")
     except HTTPException:
         raise
     except Exception as e:
@@ -81,7 +190,7 @@ async def update_policy(
         )
         if not policy:
             raise HTTPException(status_code=404, detail="Policy not found")
-        return policy
+        return ORJSONResponse(policy.model_dump(mode="json"))
     except HTTPException:
         raise
     except Exception as e:
@@ -115,7 +224,7 @@ async def toggle_policy_status(
         policy = await policy_service.toggle_policy_status(policy_id, organization_id)
         if not policy:
             raise HTTPException(status_code=404, detail="Policy not found")
-        return policy
+        return ORJSONResponse(policy.model_dump(mode="json"))
     except HTTPException:
         raise
     except Exception as e:
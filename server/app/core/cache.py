@@ -0,0 +1,161 @@
+import asyncio
+import os
+import logging
+from typing import Callable, List, Optional
+import redis.asyncio as redis
+
+logger = logging.getLogger(__name__)
+
+POLICY_INVALIDATION_CHANNEL = "policies:invalidate"
+POLICY_CACHE_TTL_SECONDS = 60
+POLICY_CHANGE_CLAIM_TTL_SECONDS = 60
+# Far longer than POLICY_CACHE_TTL_SECONDS: when an idle organization's
+# generation resets, every entry written under the old one is long gone
+POLICY_CACHE_GENERATION_TTL_SECONDS = 86_400
+
+class RedisCache:
+    client: Optional[redis.Redis] = None
+    listener: Optional[asyncio.Task] = None
+
+redis_cache = RedisCache()
+
+async def connect_to_redis():
+    """Create Redis connection; the server keeps running without it"""
+    redis_url = os.getenv("REDIS_URL", "redis://localhost:6379")
+
+    try:
+        redis_cache.client = redis.from_url(redis_url, decode_responses=True)
+        await redis_cache.client.ping()
+        logger.info(f"Connected to Redis at {redis_url}")
+    except Exception as e:
+        logger.warning(f"Redis unavailable, continuing without it: {e}")
+        redis_cache.client = None
+
+async def close_redis_connection():
+    """Stop the invalidation listener and close the Redis connection"""
+    if redis_cache.listener:
+        redis_cache.listener.cancel()
+        redis_cache.listener = None
+    if redis_cache.client:
+        await redis_cache.client.close()
+        redis_cache.client = None
+        logger.info("Disconnected from Redis")
+
+def get_redis() -> Optional[redis.Redis]:
+    """Get Redis client, or None when Redis is not connected"""
+    return redis_cache.client
+
+def policy_cache_key(organization_id: str, *parts) -> str:
+    """Cache key for policy reads; always scoped to the organization.
+
+    Single policies live under "id" and lists under "set", so a client-supplied
+    policy id can never name a list entry. Cached reads also carry the
+    organization's generation; see versioned_policy_cache_key.
+    """
+    return ":".join(["policy", organization_id, *(str(part) for part in parts)])
+
+def _generation_key(organization_id: str) -> str:
+    return policy_cache_key(organization_id, "gen")
+
+async def policy_cache_generation(organization_id: str) -> str:
+    """Current cache generation of an organization: "0" until its first
+    invalidation, and also when Redis fails"""
+    if not redis_cache.client:
+        return "0"
+    try:
+        return await redis_cache.client.get(_generation_key(organization_id)) or "0"
+    except Exception as e:
+        logger.warning(f"Redis read failed for the policy cache generation of {organization_id}: {e}")
+        return "0"
+
+async def versioned_policy_cache_key(organization_id: str, *parts) -> str:
+    """policy_cache_key under the organization's current generation, so one
+    INCR in invalidate_policy_cache retires every key built before it"""
+    return policy_cache_key(organization_id, await policy_cache_generation(organization_id), *parts)
+
+async def cache_get(key: str) -> Optional[str]:
+    """Read a cached value; misses and Redis errors both return None"""
+    if not redis_cache.client:
+        return None
+    try:
+        return await redis_cache.client.get(key)
+    except Exception as e:
+        logger.warning(f"Redis read failed for {key}: {e}")
+        return None
+
+async def cache_get_many(keys: List[str]) -> List[Optional[str]]:
+    """Read several cached values in one MGET; errors count as misses for all"""
+    if not redis_cache.client or not keys:
+        return [None] * len(keys)
+    try:
+        return await redis_cache.client.mget(keys)
+    except Exception as e:
+        logger.warning(f"Redis read failed for {len(keys)} keys: {e}")
+        return [None] * len(keys)
+
+async def cache_set(key: str, value, ttl: int):
+    """Store a value with an expiry; Redis errors are logged and ignored"""
+    if not redis_cache.client:
+        return
+    try:
+        await redis_cache.client.set(key, value, ex=ttl)
+    except Exception as e:
+        logger.warning(f"Redis write failed for {key}: {e}")
+
+async def invalidate_policy_cache(organization_id: str):
+    """Retire every cached policy read for an organization by moving it to a
+    new generation; the old entries are never read again and expire by TTL"""
+    if not redis_cache.client:
+        return
+    try:
+        async with redis_cache.client.pipeline(transaction=False) as pipe:
+            key = _generation_key(organization_id)
+            await pipe.incr(key).expire(key, POLICY_CACHE_GENERATION_TTL_SECONDS).execute()
+    except Exception as e:
+        logger.error(f"Failed to invalidate policy cache: {e}")
+
+async def claim_policy_change(change_id: str) -> bool:
+    """Claim a change stream event so only one worker acts on it.
+
+    Every worker sees every change; SET NX on the event's resume token lets the
+    first one through. Without Redis, or when it errors, the caller proceeds:
+    a duplicate invalidation is only wasted work.
+    """
+    if not redis_cache.client:
+        return True
+    try:
+        return bool(await redis_cache.client.set(
+            f"policy-change:{change_id}", 1, nx=True, ex=POLICY_CHANGE_CLAIM_TTL_SECONDS
+        ))
+    except Exception as e:
+        logger.warning(f"Failed to claim policy change {change_id}: {e}")
+        return True
+
+async def publish_policy_invalidation(organization_id: str):
+    """Tell every worker to drop its cached policies for an organization"""
+    if not redis_cache.client:
+        return
+    try:
+        await redis_cache.client.publish(POLICY_INVALIDATION_CHANNEL, organization_id)
+    except Exception as e:
+        logger.error(f"Failed to publish policy invalidation: {e}")
+
+def start_policy_invalidation_listener(handler: Callable[[str], None]):
+    """Subscribe to policy invalidations published by other workers"""
+    if redis_cache.client and not redis_cache.listener:
+        redis_cache.listener = asyncio.create_task(_listen_for_policy_invalidations(handler))
+
+async def _listen_for_policy_invalidations(handler: Callable[[str], None]):
+    pubsub = redis_cache.client.pubsub()
+    try:
+        await pubsub.subscribe(POLICY_INVALIDATION_CHANNEL)
+        async for message in pubsub.listen():
+            if message.get("type") != "message":
+                continue
+            handler(message["data"])
+    except asyncio.CancelledError:
+        pass
+    except Exception as e:
+        logger.error(f"Policy invalidation listener stopped: {e}")
+    finally:
+        await pubsub.close()
@@ -5,66 +5,69 @@ Configuration management for SentinelAI FastAPI server
 import os
 from functools import lru_cache
 from typing import Optional, List
-from pydantic import BaseSettings, Field
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
     """Application settings"""
     
     # Server configuration
-    HOST: str = Field(default="0.0.0.0", env="HOST")
-    PORT: int = Field(default=8000, env="PORT")
-    DEBUG: bool = Field(default=False, env="DEBUG")
+    HOST: str = Field(default="0.0.0.0")
+    PORT: int = Field(default=8000)
+    DEBUG: bool = Field(default=False)
     
     # Database configuration
-    MONGODB_URL: str = Field(default="mongodb://localhost:27017", env="MONGODB_URL")
-    DATABASE_NAME: str = Field(default="sentinelai", env="DATABASE_NAME")
+    MONGODB_URL: str = Field(default="mongodb://localhost:27017")
+    DATABASE_NAME: str = Field(default="sentinelai")
     
     # Redis configuration
-    REDIS_URL: str = Field(default="redis://localhost:6379", env="REDIS_URL")
+    REDIS_URL: str = Field(default="redis://localhost:6379")
     
     # Authentication
-    SECRET_KEY: str = Field(default="your-secret-key-change-in-production", env="SECRET_KEY")
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = Field(default=30, env="ACCESS_TOKEN_EXPIRE_MINUTES")
+    SECRET_KEY: str = Field(default="your-secret-key-change-in-production")
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = Field(default=30)
     
     # API Keys for LLM providers
-    OPENAI_API_KEY: Optional[str] = Field(default=None, env="OPENAI_API_KEY")
-    ANTHROPIC_API_KEY: Optional[str] = Field(default=None, env="ANTHROPIC_API_KEY")
-    GOOGLE_API_KEY: Optional[str] = Field(default=None, env="GOOGLE_API_KEY")
-    AZURE_OPENAI_API_KEY: Optional[str] = Field(default=None, env="AZURE_OPENAI_API_KEY")
-    AZURE_OPENAI_ENDPOINT: Optional[str] = Field(default=None, env="AZURE_OPENAI_ENDPOINT")
+    OPENAI_API_KEY: Optional[str] = Field(default=None)
+    ANTHROPIC_API_KEY: Optional[str] = Field(default=None)
+    GOOGLE_API_KEY: Optional[str] = Field(default=None)
+    AZURE_OPENAI_API_KEY: Optional[str] = Field(default=None)
+    AZURE_OPENAI_ENDPOINT: Optional[str] = Field(default=None)
     
     # Content safety API keys
-    AZURE_CONTENT_SAFETY_KEY: Optional[str] = Field(default=None, env="AZURE_CONTENT_SAFETY_KEY")
-    AZURE_CONTENT_SAFETY_ENDPOINT: Optional[str] = Field(default=None, env="AZURE_CONTENT_SAFETY_ENDPOINT")
+    AZURE_CONTENT_SAFETY_KEY: Optional[str] = Field(default=None)
+    AZURE_CONTENT_SAFETY_ENDPOINT: Optional[str] = Field(default=None)
     
     # Rate limiting
-    RATE_LIMIT_REQUESTS_PER_MINUTE: int = Field(default=60, env="RATE_LIMIT_REQUESTS_PER_MINUTE")
-    RATE_LIMIT_BURST: int = Field(default=10, env="RATE_LIMIT_BURST")
+    RATE_LIMIT_REQUESTS_PER_MINUTE: int = Field(default=60)
+    RATE_LIMIT_BURST: int = Field(default=10)
     
     # Performance settings
-    MAX_CONCURRENT_EVALUATIONS: int = Field(default=100, env="MAX_CONCURRENT_EVALUATIONS")
-    EVALUATION_TIMEOUT_SECONDS: int = Field(default=30, env="EVALUATION_TIMEOUT_SECONDS")
+    MAX_CONCURRENT_EVALUATIONS: int = Field(default=100)
+    EVALUATION_TIMEOUT_SECONDS: int = Field(default=30)
+    # ML evaluation processes per server worker, each with its own models;
+    # 0 evaluates on the worker's event loop instead
+    EVAL_POOL_WORKERS: int = Field(default=1)
+    TOXICITY_ONNX_DIR: str = Field(default="models/toxic-bert-int8")
+    RUST_EVALUATOR_BIN: str = Field(default="sentinelai")
     
     # Logging
-    LOG_LEVEL: str = Field(default="INFO", env="LOG_LEVEL")
+    LOG_LEVEL: str = Field(default="INFO")
     
     # CORS settings
     CORS_ORIGINS: List[str] = Field(
-        default=["http://localhost:3000", "http://localhost:5173"],
-        env="CORS_ORIGINS"
+        default=["http://localhost:3000", "http://localhost:5173"]
     )
     
     # Webhook settings
-    WEBHOOK_SECRET: Optional[str] = Field(default=None, env="WEBHOOK_SECRET")
+    WEBHOOK_SECRET: Optional[str] = Field(default=None)
     
     # Metrics and monitoring
-    ENABLE_METRICS: bool = Field(default=True, env="ENABLE_METRICS")
-    METRICS_PORT: int = Field(default=9090, env="METRICS_PORT")
+    ENABLE_METRICS: bool = Field(default=True)
+    METRICS_PORT: int = Field(default=9090)
     
-    class Config:
-        env_file = ".env"
-        case_sensitive = True
+    model_config = SettingsConfigDict(env_file=".env", case_sensitive=True, extra="ignore")
 
 
 @lru_cache()
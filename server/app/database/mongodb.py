@@ -1,13 +1,31 @@
+import asyncio
 import os
 from motor.motor_asyncio import AsyncIOMotorClient
-from typing import Optional
+from pymongo import IndexModel
+from pymongo.errors import OperationFailure, PyMongoError
+from typing import Awaitable, Callable, Optional
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Policy list indexes, one per filter shape of PolicyService list queries.
+# Each is an equality prefix followed by the list sort, so the planner picks
+# them without hints, and queries still run if index creation failed
+POLICY_LIST_INDEX = [("organization_id", 1), ("created_at", -1), ("_id", -1)]
+POLICY_STATUS_LIST_INDEX = [("organization_id", 1), ("status", 1), ("created_at", -1), ("_id", -1)]
+POLICY_TYPE_LIST_INDEX = [("organization_id", 1), ("type", 1), ("created_at", -1), ("_id", -1)]
+
+# Seconds between attempts to reopen a failed policy change stream
+POLICY_WATCH_RETRY_SECONDS = 5
+
+# Server errors that retrying cannot fix: change streams need a replica set
+# (40573), and fullDocumentBeforeChange needs MongoDB 6.0 (40415, unknown field)
+CHANGE_STREAM_UNSUPPORTED_CODES = {40573, 40415}
+
 class MongoDB:
     client: Optional[AsyncIOMotorClient] = None
     database = None
+    policy_watcher: Optional[asyncio.Task] = None
 
 mongodb = MongoDB()
 
@@ -17,7 +35,19 @@ async def connect_to_mongo():
     database_name = os.getenv("DATABASE_NAME", "sentinelai")
     
     try:
-        mongodb.client = AsyncIOMotorClient(mongodb_url)
+        # Per process; with several gunicorn workers the server sees
+        # workers * maxPoolSize connections at most
+        mongodb.client = AsyncIOMotorClient(
+            mongodb_url,
+            maxPoolSize=int(os.getenv("MONGODB_MAX_POOL_SIZE", "50")),
+            minPoolSize=int(os.getenv("MONGODB_MIN_POOL_SIZE", "10")),
+            # Fail fast instead of queueing requests behind a saturated pool
+            waitQueueTimeoutMS=2000,
+            serverSelectionTimeoutMS=3000,
+            retryWrites=True,
+            # zstd when the server supports it; zlib needs no extra package
+            compressors="zstd,zlib"
+        )
         mongodb.database = mongodb.client[database_name]
         
         # Test the connection
@@ -32,7 +62,10 @@ async def connect_to_mongo():
         raise
 
 async def close_mongo_connection():
-    """Close database connection"""
+    """Stop the policy change watcher and close the database connection"""
+    if mongodb.policy_watcher:
+        mongodb.policy_watcher.cancel()
+        mongodb.policy_watcher = None
     if mongodb.client:
         mongodb.client.close()
         logger.info("Disconnected from MongoDB")
@@ -40,27 +73,42 @@ async def close_mongo_connection():
 async def create_indexes():
     """Create database indexes for performance"""
     try:
-        # Policies collection indexes
-        await mongodb.database.policies.create_index([("organization_id", 1), ("status", 1)])
-        await mongodb.database.policies.create_index([("type", 1)])
-        await mongodb.database.policies.create_index([("created_at", -1)])
-        
-        # Users collection indexes
-        await mongodb.database.users.create_index([("email", 1)], unique=True)
-        await mongodb.database.users.create_index([("organization_id", 1)])
-        await mongodb.database.users.create_index([("api_key", 1)], sparse=True)
-        
-        # Organizations collection indexes
-        await mongodb.database.organizations.create_index([("slug", 1)], unique=True)
-        
-        # Evaluations collection indexes
-        await mongodb.database.evaluations.create_index([("organization_id", 1), ("created_at", -1)])
-        await mongodb.database.evaluations.create_index([("user_id", 1)])
-        await mongodb.database.evaluations.create_index([("status", 1)])
-        
-        # Evaluation results collection indexes
-        await mongodb.database.evaluation_results.create_index([("request_id", 1)])
-        await mongodb.database.evaluation_results.create_index([("created_at", -1)])
+        # One createIndexes command per collection, all collections in parallel
+        await asyncio.gather(
+            # Policies collection indexes; the compound indexes serve the
+            # newest-first pages of list_policies, unfiltered or filtered by
+            # status (get_active_policies) or type
+            mongodb.database.policies.create_indexes([
+                IndexModel(POLICY_STATUS_LIST_INDEX),
+                IndexModel(POLICY_LIST_INDEX),
+                IndexModel(POLICY_TYPE_LIST_INDEX)
+            ]),
+            
+            # Users collection indexes
+            mongodb.database.users.create_indexes([
+                IndexModel([("email", 1)], unique=True),
+                IndexModel([("organization_id", 1)]),
+                IndexModel([("api_key", 1)], sparse=True)
+            ]),
+            
+            # Organizations collection indexes
+            mongodb.database.organizations.create_indexes([
+                IndexModel([("slug", 1)], unique=True)
+            ]),
+            
+            # Evaluations collection indexes
+            mongodb.database.evaluations.create_indexes([
+                IndexModel([("organization_id", 1), ("created_at", -1)]),
+                IndexModel([("user_id", 1)]),
+                IndexModel([("status", 1)])
+            ]),
+            
+            # Evaluation results collection indexes
+            mongodb.database.evaluation_results.create_indexes([
+                IndexModel([("request_id", 1)]),
+                IndexModel([("created_at", -1)])
+            ])
+        )
         
         logger.info("Database indexes created successfully")
         
@@ -69,4 +117,49 @@ async def create_indexes():
 
 def get_database():
     """Get database instance"""
-    return mongodb.database
\ No newline at end of file
+    return mongodb.database
+
+def start_policy_change_watcher(handler: Callable[[str, str], Awaitable[None]]):
+    """Call handler with the organization_id and change id (its resume token) of
+    every policy written by anyone, including scripts and services that bypass
+    the API's own invalidation"""
+    if mongodb.database is not None and not mongodb.policy_watcher:
+        mongodb.policy_watcher = asyncio.create_task(_watch_policy_changes(handler))
+
+async def _watch_policy_changes(handler: Callable[[str, str], Awaitable[None]]):
+    pipeline = [{"$match": {"operationType": {"$in": ["insert", "update", "replace", "delete"]}}}]
+    resume_token = None
+    while True:
+        try:
+            async with mongodb.database.policies.watch(
+                pipeline,
+                full_document="updateLookup",
+                # Deletes only carry the organization when pre-images are enabled
+                full_document_before_change="whenAvailable",
+                resume_after=resume_token
+            ) as stream:
+                async for change in stream:
+                    resume_token = stream.resume_token
+                    document = change.get("fullDocument") or change.get("fullDocumentBeforeChange")
+                    if not (document and document.get("organization_id")):
+                        continue
+                    try:
+                        await handler(document["organization_id"], resume_token["_data"])
+                    except Exception as e:
+                        # One bad change must not stop invalidation for the rest
+                        logger.error(f"Policy change handler failed: {e}")
+        except asyncio.CancelledError:
+            return
+        except OperationFailure as e:
+            if e.code in CHANGE_STREAM_UNSUPPORTED_CODES:
+                # Caches then rely on the API's own invalidation and their TTLs
+                logger.warning(f"Policy change streams are not supported by this MongoDB deployment: {e}")
+                return
+            logger.warning(f"Policy change stream failed, retrying: {e}")
+            await asyncio.sleep(POLICY_WATCH_RETRY_SECONDS)
+        except PyMongoError as e:
+            logger.warning(f"Policy change stream unavailable, retrying: {e}")
+            await asyncio.sleep(POLICY_WATCH_RETRY_SECONDS)
+        except Exception as e:
+            logger.error(f"Policy change watcher failed, retrying: {e}")
+            await asyncio.sleep(POLICY_WATCH_RETRY_SECONDS)
@@ -0,0 +1,92 @@
+"""
+Micro-batching of concurrent blocking calls onto an executor
+"""
+
+import asyncio
+from abc import ABC, abstractmethod
+from concurrent.futures import Executor
+from typing import Any, List, Optional, Set, Tuple
+
+class MicroBatchQueue(ABC):
+    """Coalesces concurrent requests into blocking batch calls on an executor.
+
+    Up to max_in_flight batches run at once, one per executor thread; while
+    they are all busy, new requests keep queueing and form the next batch.
+    """
+
+    MAX_BATCH = 32
+    MAX_WAIT_MS = 5
+    SORT_BY_LENGTH = False
+
+    def __init__(self, executor: Executor, max_in_flight: int = 1):
+        self.executor = executor
+        self.max_in_flight = max_in_flight
+        self._queue: Optional[asyncio.Queue] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._in_flight: Set[asyncio.Task] = set()
+
+    @abstractmethod
+    def _process(self, contents: List[str]) -> List[Any]:
+        """Handle one batch; returns one result per content, in order"""
+
+    async def submit(self, content: str) -> Any:
+        """Queue content for the next batch and wait for its result"""
+        # The evaluator is built at import time, so the queue and its worker
+        # are created lazily on the running loop
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._slots = asyncio.Semaphore(self.max_in_flight)
+            self._worker = asyncio.create_task(self._run())
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((content, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            # Wait for a free executor thread first, so requests arriving in
+            # the meantime join this batch instead of waiting behind it
+            await self._slots.acquire()
+            try:
+                batch = [await self._queue.get()]
+            except BaseException:
+                self._slots.release()
+                raise
+
+            # Collect more items until the batch is full or the window closes
+            deadline = loop.time() + self.MAX_WAIT_MS / 1000
+            while len(batch) < self.MAX_BATCH:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # Go straight back to collecting; the batch releases its slot when done
+            task = asyncio.create_task(self._dispatch(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _dispatch(self, batch: List[Tuple[str, asyncio.Future]]):
+        try:
+            if self.SORT_BY_LENGTH:
+                batch.sort(key=lambda item: len(item[0]))
+            contents = [content for content, _ in batch]
+
+            try:
+                outputs = await asyncio.get_running_loop().run_in_executor(self.executor, self._process, contents)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+
+            for (_, future), output in zip(batch, outputs):
+                if not future.done():
+                    future.set_result(output)
+        finally:
+            self._slots.release()
@@ -0,0 +1,65 @@
+"""
+Pattern matching for the content safety categories
+"""
+
+import re
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+try:
+    import re2
+except ImportError:  # optional: fall back to the backtracking re engine
+    re2 = None
+
+CATEGORY_PATTERNS = {
+    'hate_speech': [
+        r'\b(hate|despise|loathe)\s+\w+\s+(people|group|race|religion)',
+        r'\b(kill|destroy|eliminate)\s+all\s+\w+',
+    ],
+    'harassment': [
+        r'\b(stupid|idiot|moron|dumb)\b.*\b(you|person)',
+        r'\b(shut\s+up|go\s+away|leave\s+me\s+alone)',
+    ],
+    'violence': [
+        r'\b(kill|murder|assault|attack|hurt|harm)\b',
+        r'\b(weapon|gun|knife|bomb|explosive)\b',
+    ],
+    'self_harm': [
+        r'\b(suicide|kill\s+myself|end\s+my\s+life)',
+        r'\b(cut|hurt|harm)\s+myself',
+    ]
+}
+
+def _compile(pattern: str):
+    # Case-insensitive matching replaces lowercasing the content on every call.
+    # RE2 runs in linear time, with no backtracking blow-up on adversarial input
+    if re2 is not None:
+        return re2.compile("(?i)" + pattern)
+    return re.compile(pattern, re.IGNORECASE)
+
+@lru_cache(maxsize=None)
+def _category_patterns(category: str) -> Optional[Tuple[object, Tuple[object, ...]]]:
+    """The category's patterns fused into one alternation, plus each compiled alone"""
+    patterns = CATEGORY_PATTERNS.get(category)
+    if not patterns:
+        return None
+    fused = _compile("|".join(f"(?:{pattern})" for pattern in patterns))
+    return fused, tuple(_compile(pattern) for pattern in patterns)
+
+def match_categories(content: str, categories: List[str]) -> List[Tuple[str, str]]:
+    """Return (category, first matching pattern) for every category the content matches.
+
+    Each category is searched on its own, so text matching several categories
+    (e.g. self harm and violence) reports all of them, in the given order.
+    """
+    matches = []
+    for category in categories:
+        compiled = _category_patterns(category)
+        if compiled is None:
+            continue
+        fused, patterns = compiled
+        # One search per category; the individual patterns only run on a hit
+        if fused.search(content):
+            pattern = next(p for p in patterns if p.search(content))
+            matches.append((category, pattern.pattern.removeprefix("(?i)")))
+    return matches
@@ -2,11 +2,15 @@
 Content Safety Evaluator using ML models for toxicity detection
 """
 
-import asyncio
+import os
+from abc import ABC, abstractmethod
 import time
+from concurrent.futures import Executor, ThreadPoolExecutor
 from typing import Dict, Any, Optional, List
+import numpy as np
 import structlog
-from transformers import pipeline, AutoTokenizer, AutoModelForSequenceClassification
+from transformers import AutoConfig, AutoTokenizer, AutoModelForSequenceClassification
+from huggingface_hub import hf_hub_download
 import torch
 from azure.cognitiveservices.language.textanalytics import TextAnalyticsClient
 from azure.core.credentials import AzureKeyCredential
@@ -15,16 +19,212 @@ from app.core.config import get_settings
 from app.models.evaluation import EvaluationRequest, EvaluationResult, PolicyResult, ViolationSeverity
 from app.models.policy import Policy, ContentSafetyConfig
 from .base import BaseEvaluator
+from .batching import MicroBatchQueue
+from .categories import match_categories
+
+try:
+    import onnxruntime
+    from optimum.onnxruntime import ORTModelForSequenceClassification, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+except ImportError:  # optional: fall back to the PyTorch model
+    onnxruntime = None
 
 logger = structlog.get_logger()
 
+TOXICITY_MODEL_NAME = "unitary/toxic-bert"
+
+# Shorter (stripped) content skips the toxicity model
+MIN_TOXICITY_CONTENT_CHARS = 4
+
+# Inference is forward-only, and concurrent batches already run on separate
+# executor threads; cap intra-op threads so they don't oversubscribe the CPU
+INFERENCE_THREADS = max(1, (os.cpu_count() or 2) // 2)
+torch.set_grad_enabled(False)
+torch.set_num_threads(INFERENCE_THREADS)
+try:
+    torch.set_num_interop_threads(1)
+except RuntimeError:  # already fixed once torch has run parallel work
+    pass
+
+# Severity order for picking the most severe violation
+_SEVERITY_RANK = {
+    ViolationSeverity.LOW: 0,
+    ViolationSeverity.MEDIUM: 1,
+    ViolationSeverity.HIGH: 2,
+    ViolationSeverity.CRITICAL: 3
+}
+
+class ToxicityClassifier(ABC):
+    """Tokenizes a batch once and scores it with the text-classification pipeline's call interface"""
+    
+    tensor_type = "np"
+    
+    def __init__(self, tokenizer, config):
+        self.tokenizer = tokenizer
+        self.id2label = config.id2label
+        self.multi_label = config.problem_type == "multi_label_classification" or config.num_labels == 1
+    
+    def __call__(self, texts, batch_size=None, truncation=True, padding=True) -> List[List[Dict[str, Any]]]:
+        encoded = self.tokenizer(
+            texts, truncation=truncation, padding=padding, max_length=512, return_tensors=self.tensor_type
+        )
+        logits = self._forward(encoded)
+        
+        # Same score function the pipeline applies for this model config
+        if self.multi_label:
+            probs = 1.0 / (1.0 + np.exp(-logits))
+        else:
+            exp = np.exp(logits - logits.max(axis=-1, keepdims=True))
+            probs = exp / exp.sum(axis=-1, keepdims=True)
+        
+        return [
+            [{"label": self.id2label[i], "score": float(score)} for i, score in enumerate(row)]
+            for row in probs
+        ]
+    
+    @abstractmethod
+    def _forward(self, encoded) -> np.ndarray:
+        """Run the model on a tokenized batch and return its logits"""
+
+class TorchToxicityClassifier(ToxicityClassifier):
+    """PyTorch model fed straight from the fast tokenizer, without the pipeline wrapper"""
+    
+    tensor_type = "pt"
+    
+    def __init__(self, model, tokenizer, config, device: torch.device):
+        super().__init__(tokenizer, config)
+        self.model = model
+        self.device = device
+    
+    def _forward(self, encoded) -> np.ndarray:
+        with torch.inference_mode():
+            logits = self.model(**encoded.to(self.device)).logits
+        return logits.float().cpu().numpy()
+    
+    @classmethod
+    def load(cls, model_name: str) -> "TorchToxicityClassifier":
+        if torch.cuda.is_available():
+            device = torch.device("cuda")
+            model = AutoModelForSequenceClassification.from_pretrained(
+                model_name, torch_dtype=torch.float16, low_cpu_mem_usage=True
+            ).to(device)
+        else:
+            device = torch.device("cpu")
+            model = cls._load_mmapped(model_name)
+        model.eval()
+        
+        classifier = cls(model, AutoTokenizer.from_pretrained(model_name, use_fast=True), model.config, device)
+        
+        if hasattr(torch, "compile"):
+            try:
+                classifier.model = torch.compile(model, mode="reduce-overhead", fullgraph=False)
+                # Compilation happens on the first call; do it now rather than on a request
+                classifier(["warmup"])
+            except Exception as e:
+                logger.warning("torch.compile failed for toxicity model, using eager mode", error=str(e))
+                classifier.model = model
+        return classifier
+    
+    @staticmethod
+    def _load_mmapped(model_name: str):
+        """Load CPU weights memory-mapped from the checkpoint file.
+
+        The pages stay file-backed, so every process that loads the model
+        (including the evaluation pool workers) shares one copy in the page
+        cache instead of holding its own.
+        """
+        try:
+            weights_path = hf_hub_download(model_name, "pytorch_model.bin")
+            model = AutoModelForSequenceClassification.from_config(AutoConfig.from_pretrained(model_name))
+            state_dict = torch.load(weights_path, map_location="cpu", mmap=True, weights_only=True)
+            missing = model.load_state_dict(state_dict, strict=False, assign=True).missing_keys
+            if missing:
+                raise ValueError(f"checkpoint is missing {len(missing)} weights")
+            return model
+        except Exception as e:
+            logger.warning("Memory-mapped toxicity weights unavailable", error=str(e))
+            return AutoModelForSequenceClassification.from_pretrained(model_name, low_cpu_mem_usage=True)
+
+class OnnxToxicityClassifier(ToxicityClassifier):
+    """INT8-quantized ONNX Runtime model"""
+    
+    def __init__(self, session, tokenizer, config):
+        super().__init__(tokenizer, config)
+        self.session = session
+        self.input_names = [i.name for i in session.get_inputs()]
+    
+    def _forward(self, encoded) -> np.ndarray:
+        feeds = {name: encoded[name].astype(np.int64) for name in self.input_names if name in encoded}
+        return self.session.run(None, feeds)[0]
+    
+    @classmethod
+    def load(cls, model_name: str, save_dir: str) -> "OnnxToxicityClassifier":
+        """Export and dynamically quantize the model on first use, then load it"""
+        quantized_path = os.path.join(save_dir, "model_quantized.onnx")
+        if not os.path.exists(quantized_path):
+            logger.info("Exporting toxicity model to quantized ONNX", save_dir=save_dir)
+            model = ORTModelForSequenceClassification.from_pretrained(model_name, export=True)
+            quantizer = ORTQuantizer.from_pretrained(model)
+            quantizer.quantize(
+                save_dir=save_dir,
+                quantization_config=AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+            )
+        
+        providers = ["CPUExecutionProvider"]
+        if torch.cuda.is_available() and "CUDAExecutionProvider" in onnxruntime.get_available_providers():
+            providers.insert(0, "CUDAExecutionProvider")
+        
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = INFERENCE_THREADS
+        options.inter_op_num_threads = 1
+        session = onnxruntime.InferenceSession(quantized_path, sess_options=options, providers=providers)
+        return cls(session, AutoTokenizer.from_pretrained(model_name), AutoConfig.from_pretrained(model_name))
+
+class BatchedToxicityQueue(MicroBatchQueue):
+    """Coalesces concurrent toxicity requests into one classifier forward pass"""
+    
+    # Similar lengths together keep padding within the batch small
+    SORT_BY_LENGTH = True
+    
+    def __init__(self, classifier, executor: Executor, max_in_flight: int = 1):
+        super().__init__(executor, max_in_flight)
+        self.classifier = classifier
+    
+    def _process(self, contents: List[str]) -> List[List[Dict[str, Any]]]:
+        return self.classifier(contents, batch_size=len(contents), truncation=True, padding=True)
+
+class BatchedAzureQueue(MicroBatchQueue):
+    """Coalesces concurrent Azure requests into one multi-document call"""
+    
+    # Text Analytics accepts at most 10 documents per request
+    MAX_BATCH = 10
+    MAX_WAIT_MS = 20
+    
+    def __init__(self, client, executor: Executor, max_in_flight: int = 1):
+        super().__init__(executor, max_in_flight)
+        self.client = client
+    
+    def _process(self, contents: List[str]) -> List[Any]:
+        return list(self.client.analyze_sentiment(contents))
+
 class ContentSafetyEvaluator(BaseEvaluator):
     """ML-based content safety evaluator for toxicity detection"""
     
     def __init__(self):
         self.settings = get_settings()
         self.toxicity_classifier = None
+        self.toxicity_batcher = None
         self.azure_client = None
+        self.azure_batcher = None
+        # Kept apart from the default executor so model inference and Azure
+        # HTTP calls can't starve each other or other blocking work; one
+        # thread on GPU serializes CUDA calls
+        self._ml_threads = 1 if torch.cuda.is_available() else 2
+        self._ml_executor = ThreadPoolExecutor(max_workers=self._ml_threads, thread_name_prefix="toxicity-model")
+        self._azure_threads = 16
+        self._azure_executor = ThreadPoolExecutor(
+            max_workers=self._azure_threads, thread_name_prefix="azure-content-safety"
+        )
         self._initialize_models()
     
     def _initialize_models(self):
@@ -32,11 +232,9 @@ class ContentSafetyEvaluator(BaseEvaluator):
         try:
             # Initialize local toxicity classifier
             logger.info("Loading toxicity classification model")
-            self.toxicity_classifier = pipeline(
-                "text-classification",
-                model="unitary/toxic-bert",
-                device=0 if torch.cuda.is_available() else -1,
-                return_all_scores=True
+            self.toxicity_classifier = self._load_toxicity_classifier()
+            self.toxicity_batcher = BatchedToxicityQueue(
+                self.toxicity_classifier, self._ml_executor, self._ml_threads
             )
             logger.info("Toxicity classifier loaded successfully")
             
@@ -46,58 +244,60 @@ class ContentSafetyEvaluator(BaseEvaluator):
                     endpoint=self.settings.AZURE_CONTENT_SAFETY_ENDPOINT,
                     credential=AzureKeyCredential(self.settings.AZURE_CONTENT_SAFETY_KEY)
                 )
+                self.azure_batcher = BatchedAzureQueue(
+                    self.azure_client, self._azure_executor, self._azure_threads
+                )
                 logger.info("Azure Content Safety client initialized")
                 
         except Exception as e:
             logger.error("Failed to initialize content safety models", error=str(e))
             raise
     
+    def _load_toxicity_classifier(self) -> ToxicityClassifier:
+        """Prefer the quantized ONNX model; use PyTorch when unavailable"""
+        if onnxruntime is not None:
+            try:
+                return OnnxToxicityClassifier.load(TOXICITY_MODEL_NAME, self.settings.TOXICITY_ONNX_DIR)
+            except Exception as e:
+                logger.warning("ONNX toxicity model unavailable, using PyTorch", error=str(e))
+        
+        return TorchToxicityClassifier.load(TOXICITY_MODEL_NAME)
+    
     async def evaluate(self, request: EvaluationRequest, policy: Policy) -> EvaluationResult:
         """Evaluate content for safety violations"""
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         
         try:
-            config = policy.config
-            if not isinstance(config, ContentSafetyConfig):
-                raise ValueError("Invalid policy config for content safety evaluator")
+            # Stored policies carry their config as a plain dict
+            config = ContentSafetyConfig.model_validate(policy.config)
             
-            # Run multiple safety checks in parallel
-            tasks = []
+            # Category-specific checks run in-process, one regex search per category
+            try:
+                results = self._evaluate_categories(request.content, config)
+            except Exception as e:
+                logger.warning("Category evaluation failed", error=str(e))
+                results = []
             
             # Local toxicity detection
-            tasks.append(self._evaluate_toxicity_local(request.content, config))
+            results.append(await self._evaluate_toxicity_local(request.content, config))
             
-            # Azure Content Safety (if available)
-            if self.azure_client:
-                tasks.append(self._evaluate_azure_content_safety(request.content, config))
-            
-            # Category-specific checks
-            for category in config.categories:
-                tasks.append(self._evaluate_category(request.content, category, config))
-            
-            # Execute all evaluations concurrently
-            results = await asyncio.gather(*tasks, return_exceptions=True)
+            # Azure Content Safety (if available) is the slow, billed check; skip
+            # it when a local check already found a HIGH severity violation
+            # (local toxicity scores above 0.8 are HIGH)
+            confident = any(r and r.get('severity') == ViolationSeverity.HIGH for r in results)
+            if self.azure_client and not confident:
+                results.append(await self._evaluate_azure_content_safety(request.content, config))
             
             # Aggregate results
-            violations = []
-            max_confidence = 0.0
-            max_severity = ViolationSeverity.LOW
-            
-            for result in results:
-                if isinstance(result, Exception):
-                    logger.warning("Content safety evaluation failed", error=str(result))
-                    continue
-                
-                if result and result.get('violation'):
-                    violations.append(result)
-                    max_confidence = max(max_confidence, result.get('confidence', 0.0))
-                    
-                    # Update severity
-                    severity = result.get('severity', ViolationSeverity.LOW)
-                    if severity.value > max_severity.value:
-                        max_severity = severity
+            violations = [r for r in results if r and r.get('violation')]
+            max_confidence = max((r.get('confidence', 0.0) for r in violations), default=0.0)
+            max_severity = max(
+                (r.get('severity', ViolationSeverity.LOW) for r in violations),
+                key=_SEVERITY_RANK.__getitem__,
+                default=ViolationSeverity.LOW
+            )
             
-            execution_time = int((time.time() - start_time) * 1000)
+            execution_time = (time.perf_counter_ns() - start_ns) // 1_000_000
             
             # Determine final result
             if violations:
@@ -135,7 +335,7 @@ class ContentSafetyEvaluator(BaseEvaluator):
             
         except Exception as e:
             logger.error("Content safety evaluation failed", error=str(e), request_id=request.id)
-            execution_time = int((time.time() - start_time) * 1000)
+            execution_time = (time.perf_counter_ns() - start_ns) // 1_000_000
             
             return EvaluationResult(
                 request_id=request.id,
@@ -152,13 +352,14 @@ class ContentSafetyEvaluator(BaseEvaluator):
     
     async def _evaluate_toxicity_local(self, content: str, config: ContentSafetyConfig) -> Optional[Dict[str, Any]]:
         """Evaluate toxicity using local BERT model"""
+        # Pings like "ok" or "hi" carry no toxicity signal but cost a full
+        # forward pass; the category scan still runs on them
+        if len(content.strip()) < MIN_TOXICITY_CONTENT_CHARS:
+            return None
+        
         try:
-            # Run inference in thread pool to avoid blocking
-            loop = asyncio.get_event_loop()
-            results = await loop.run_in_executor(
-                None, 
-                lambda: self.toxicity_classifier(content)
-            )
+            # Batched with concurrent requests; inference runs in a thread pool
+            results = await self.toxicity_batcher.submit(content)
             
             # Find toxicity score
             toxicity_score = 0.0
@@ -191,32 +392,27 @@ class ContentSafetyEvaluator(BaseEvaluator):
             if not self.azure_client:
                 return None
             
-            # Run Azure API call in thread pool
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None,
-                lambda: self.azure_client.analyze_sentiment([content])
-            )
+            # Batched with concurrent requests; the call runs in its own thread pool
+            doc = await self.azure_batcher.submit(content)
             
             # Process Azure response
-            for doc in response:
-                if hasattr(doc, 'error'):
-                    continue
-                
-                # Check for harmful content categories
-                if hasattr(doc, 'categories'):
-                    for category in doc.categories:
-                        if category.severity > config.toxicity_threshold:
-                            return {
-                                'violation': True,
-                                'type': 'azure_content_safety',
-                                'category': category.category,
-                                'severity_score': category.severity,
-                                'threshold': config.toxicity_threshold,
-                                'confidence': category.confidence_score,
-                                'severity': ViolationSeverity.HIGH if category.severity > 0.8 else ViolationSeverity.MEDIUM,
-                                'method': 'azure_api'
-                            }
+            if hasattr(doc, 'error'):
+                return None
+            
+            # Check for harmful content categories
+            if hasattr(doc, 'categories'):
+                for category in doc.categories:
+                    if category.severity > config.toxicity_threshold:
+                        return {
+                            'violation': True,
+                            'type': 'azure_content_safety',
+                            'category': category.category,
+                            'severity_score': category.severity,
+                            'threshold': config.toxicity_threshold,
+                            'confidence': category.confidence_score,
+                            'severity': ViolationSeverity.HIGH if category.severity > 0.8 else ViolationSeverity.MEDIUM,
+                            'method': 'azure_api'
+                        }
             
             return None
             
@@ -224,52 +420,20 @@ class ContentSafetyEvaluator(BaseEvaluator):
             logger.warning("Azure content safety evaluation failed", error=str(e))
             return None
     
-    async def _evaluate_category(self, content: str, category: str, config: ContentSafetyConfig) -> Optional[Dict[str, Any]]:
-        """Evaluate content for specific category violations"""
-        try:
-            # Category-specific keyword matching and pattern detection
-            category_patterns = {
-                'hate_speech': [
-                    r'\b(hate|despise|loathe)\s+\w+\s+(people|group|race|religion)',
-                    r'\b(kill|destroy|eliminate)\s+all\s+\w+',
-                ],
-                'harassment': [
-                    r'\b(stupid|idiot|moron|dumb)\b.*\b(you|person)',
-                    r'\b(shut\s+up|go\s+away|leave\s+me\s+alone)',
-                ],
-                'violence': [
-                    r'\b(kill|murder|assault|attack|hurt|harm)\b',
-                    r'\b(weapon|gun|knife|bomb|explosive)\b',
-                ],
-                'self_harm': [
-                    r'\b(suicide|kill\s+myself|end\s+my\s+life)',
-                    r'\b(cut|hurt|harm)\s+myself',
-                ]
+    def _evaluate_categories(self, content: str, config: ContentSafetyConfig) -> List[Dict[str, Any]]:
+        """Evaluate content for specific category violations, one result per matched category"""
+        return [
+            {
+                'violation': True,
+                'type': 'category_specific',
+                'category': category,
+                'pattern_matched': pattern,
+                'confidence': 0.8,
+                'severity': ViolationSeverity.MEDIUM,
+                'method': 'pattern_matching'
             }
-            
-            if category not in category_patterns:
-                return None
-            
-            import re
-            patterns = category_patterns[category]
-            
-            for pattern in patterns:
-                if re.search(pattern, content.lower()):
-                    return {
-                        'violation': True,
-                        'type': 'category_specific',
-                        'category': category,
-                        'pattern_matched': pattern,
-                        'confidence': 0.8,
-                        'severity': ViolationSeverity.MEDIUM,
-                        'method': 'pattern_matching'
-                    }
-            
-            return None
-            
-        except Exception as e:
-            logger.warning("Category evaluation failed", error=str(e), category=category)
-            return None
+            for category, pattern in match_categories(content, config.categories)
+        ]
     
     def supports_policy_type(self, policy_type: str) -> bool:
         """Check if this evaluator supports the given policy type"""
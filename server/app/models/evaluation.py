@@ -18,11 +18,6 @@ class EvaluationRequest(BaseModel):
     user_id: str = Field(...)
     metadata: Dict[str, Any] = Field(default_factory=dict)
     created_at: datetime = Field(default_factory=datetime.utcnow)
-    
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
 
 class PolicyEvaluationResult(BaseModel):
     policy_id: str
@@ -46,11 +41,7 @@ class EvaluationResult(BaseModel):
     total_execution_time_ms: float = Field(ge=0.0)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     completed_at: Optional[datetime] = None
-    
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
+    error_message: Optional[str] = None
 
 class EvaluationStats(BaseModel):
     total_evaluations: int = 0
@@ -60,9 +51,4 @@ class EvaluationStats(BaseModel):
     average_execution_time_ms: float = 0.0
     violation_rate: float = 0.0
     period_start: datetime
-    period_end: datetime
-    
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
\ No newline at end of file
+    period_end: datetime
\ No newline at end of file
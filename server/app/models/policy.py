@@ -51,11 +51,27 @@ class Policy(BaseModel):
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     version: int = Field(default=1)
     tags: List[str] = Field(default_factory=list)
-    
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
+
+class PolicySummary(BaseModel):
+    """Policy fields shown in list views"""
+    id: Optional[str] = Field(default=None)
+    name: str
+    description: Optional[str] = Field(default="")
+    type: PolicyType
+    status: PolicyStatus
+    organization_id: str
+    created_at: datetime
+    updated_at: datetime
+    version: int = Field(default=1)
+
+class BulkPolicyError(BaseModel):
+    """A policy of a bulk create that was not inserted"""
+    index: int
+    message: str
+
+class BulkPolicyResult(BaseModel):
+    created: List[Policy] = Field(default_factory=list)
+    errors: List[BulkPolicyError] = Field(default_factory=list)
 
 class PolicyCreate(BaseModel):
     name: str = Field(..., min_length=1, max_length=100)
@@ -16,11 +16,6 @@ class Organization(BaseModel):
     plan: str = Field(default="free")  # free, pro, enterprise
     created_at: datetime = Field(default_factory=datetime.utcnow)
     settings: dict = Field(default_factory=dict)
-    
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
 
 class User(BaseModel):
     id: Optional[str] = Field(default=None)
@@ -32,11 +27,6 @@ class User(BaseModel):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     last_login: Optional[datetime] = None
     api_key: Optional[str] = None
-    
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
 
 class UserCreate(BaseModel):
     email: EmailStr
@@ -0,0 +1,26 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Optional
+
+def create_eval_pool(workers: int, initializer: Callable[[], None]) -> Optional[ProcessPoolExecutor]:
+    """Worker processes for comprehensive (ML) evaluation, or None to evaluate on the event loop.
+
+    Every worker loads its own copy of the models, so the pool is sized from
+    EVAL_POOL_WORKERS rather than the core count: each gunicorn worker has one.
+    """
+    if workers <= 0:
+        return None
+    # Spawned, not forked: a fork would copy the server's running event loop,
+    # threads, and open MongoDB/Redis sockets into every worker
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=initializer
+    )
+
+async def shutdown_eval_pool(pool: Optional[ProcessPoolExecutor]):
+    """Drop queued evaluations and wait for running ones off the event loop"""
+    if pool is None:
+        return
+    await asyncio.to_thread(pool.shutdown, wait=True, cancel_futures=True)
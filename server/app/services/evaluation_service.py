@@ -1,10 +1,12 @@
 import asyncio
+import hashlib
 import time
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
+from cachetools import LRUCache, TTLCache
 import logging
-import subprocess
 import json
 from datetime import datetime
+from bson import ObjectId
 
 from ..models.evaluation import (
     EvaluationRequest, 
@@ -14,15 +16,40 @@ from ..models.evaluation import (
 )
 from ..models.policy import Policy, PolicyType
 from ..services.policy_service import policy_service
+from ..services.rust_evaluator import RustEvaluatorClient
 from ..evaluators.content_safety import ContentSafetyEvaluator
 from ..database.mongodb import get_database
 
 logger = logging.getLogger(__name__)
 
+RUST_POLICY_TYPES = (PolicyType.KEYWORD_FILTER, PolicyType.PERFORMANCE)
+PYTHON_POLICY_TYPES = (PolicyType.CONTENT_SAFETY, PolicyType.SEMANTIC)
+
+# ML policies evaluated at once for a single content
+PYTHON_EVALUATION_CONCURRENCY = 8
+
+# Score of a content safety violation by severity, on the Rust evaluator's scale
+CONTENT_SAFETY_SEVERITY_SCORES = {"CRITICAL": 0.0, "HIGH": 0.2, "MEDIUM": 0.5, "LOW": 0.8}
+
+# Policies that share the same type and config, evaluated once per group
+PolicyGroups = List[List[Policy]]
+
+def new_request_id() -> str:
+    """Id of an evaluation request, in the same form as stored document ids"""
+    return str(ObjectId())
+
 class EvaluationService:
     def __init__(self):
         self.db = get_database()
         self.content_safety_evaluator = ContentSafetyEvaluator()
+        self.rust_evaluator = RustEvaluatorClient()
+        # policy_id -> recent critical results; bounded so deleted policies and
+        # old hits age out instead of accumulating for the life of the worker
+        self._critical_hits: TTLCache = TTLCache(maxsize=10_000, ttl=3600)
+        # Compiled evaluation plans keyed by the (id, updated_at) of the policy set
+        self._plan_cache: LRUCache = LRUCache(maxsize=1024)
+        # (content digest, policy id, version, updated_at) -> ML evaluator result
+        self._eval_cache: TTLCache = TTLCache(maxsize=10_000, ttl=3600)
         
     async def evaluate_content(
         self, 
@@ -32,10 +59,11 @@ class EvaluationService:
         policy_ids: List[str] = None
     ) -> EvaluationResult:
         """Evaluate content against policies with two-stage pipeline"""
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         
         # Create evaluation request
         request = EvaluationRequest(
+            id=new_request_id(),
             content=content,
             policy_ids=policy_ids or [],
             organization_id=organization_id,
@@ -44,11 +72,7 @@ class EvaluationService:
         
         # Get policies to evaluate
         if policy_ids:
-            policies = []
-            for policy_id in policy_ids:
-                policy = await policy_service.get_policy(policy_id, organization_id)
-                if policy:
-                    policies.append(policy)
+            policies = await policy_service.get_policies(policy_ids, organization_id)
         else:
             policies = await policy_service.get_active_policies(organization_id)
         
@@ -62,14 +86,21 @@ class EvaluationService:
                 total_execution_time_ms=0.0
             )
         
+        rust_groups, python_groups = self._compile_policy_plan(policies)
+        
         # Stage 1: Fast Rust evaluators (keyword_filter, performance)
-        rust_policies = [p for p in policies if p.type in [PolicyType.KEYWORD_FILTER, PolicyType.PERFORMANCE]]
-        rust_results = await self._evaluate_with_rust(content, rust_policies)
+        # Policies that blocked most often run first, since the stage stops at
+        # the first critical result
+        rust_groups = sorted(rust_groups, key=lambda g: self._critical_hits.get(str(g[0].id), 0), reverse=True)
+        rust_results = self._fan_out(
+            await self._evaluate_with_rust(content, [g[0] for g in rust_groups], stop_on_critical=True),
+            rust_groups
+        )
         
         # Early exit if critical violations found
-        critical_violations = [r for r in rust_results if r.violation and r.score < 0.3]
+        critical_violations = [r for r in rust_results if self._is_critical(r)]
         if critical_violations:
-            total_time = (time.time() - start_time) * 1000
+            total_time = (time.perf_counter_ns() - start_ns) / 1_000_000
             return EvaluationResult(
                 request_id=str(request.id),
                 status=EvaluationStatus.BLOCKED,
@@ -80,15 +111,17 @@ class EvaluationService:
             )
         
         # Stage 2: Python ML evaluators (content_safety, semantic)
-        python_policies = [p for p in policies if p.type in [PolicyType.CONTENT_SAFETY, PolicyType.SEMANTIC]]
-        python_results = await self._evaluate_with_python(content, python_policies)
+        python_results = self._fan_out(
+            await self._evaluate_with_python(request, [g[0] for g in python_groups]),
+            python_groups
+        )
         
         # Combine results
         all_results = rust_results + python_results
         overall_score = min(r.score for r in all_results) if all_results else 1.0
         has_violations = any(r.violation for r in all_results)
         
-        total_time = (time.time() - start_time) * 1000
+        total_time = (time.perf_counter_ns() - start_ns) / 1_000_000
         
         result = EvaluationResult(
             request_id=str(request.id),
@@ -106,64 +139,61 @@ class EvaluationService:
         logger.info(f"Evaluation completed in {total_time:.2f}ms with {len(all_results)} policies")
         return result
     
-    async def _evaluate_with_rust(self, content: str, policies: List[Policy]) -> List[PolicyEvaluationResult]:
-        """Evaluate content using Rust CLI for fast policies"""
-        results = []
-        
-        for policy in policies:
-            start_time = time.time()
+    def _compile_policy_plan(self, policies: List[Policy]) -> Tuple[PolicyGroups, PolicyGroups]:
+        """Group policies by (type, config) for each stage, rebuilt only when the set changes"""
+        key = tuple((str(p.id), p.updated_at) for p in policies)
+        plan = self._plan_cache.get(key)
+        if plan is None:
+            groups: Dict[Tuple[str, str], List[Policy]] = {}
+            for policy in policies:
+                predicate = (policy.type.value, json.dumps(policy.config, sort_keys=True))
+                groups.setdefault(predicate, []).append(policy)
             
-            try:
-                # Call Rust CLI for evaluation
-                cmd = [
-                    "cargo", "run", "--manifest-path", "core/Cargo.toml", "--",
-                    "evaluate",
-                    "--content", content,
-                    "--policy-type", policy.type.value,
-                    "--config", json.dumps(policy.config)
-                ]
-                
-                process = await asyncio.create_subprocess_exec(
-                    *cmd,
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE
-                )
-                
-                stdout, stderr = await process.communicate()
-                execution_time = (time.time() - start_time) * 1000
-                
-                if process.returncode == 0:
-                    result_data = json.loads(stdout.decode())
-                    
-                    results.append(PolicyEvaluationResult(
-                        policy_id=str(policy.id),
-                        policy_name=policy.name,
-                        policy_type=policy.type.value,
-                        status=EvaluationStatus.COMPLETED,
-                        score=result_data.get("score", 1.0),
-                        confidence=result_data.get("confidence", 1.0),
-                        violation=result_data.get("violation", False),
-                        details=result_data.get("details", {}),
-                        execution_time_ms=execution_time
-                    ))
-                else:
-                    logger.error(f"Rust evaluation failed: {stderr.decode()}")
-                    results.append(PolicyEvaluationResult(
-                        policy_id=str(policy.id),
-                        policy_name=policy.name,
-                        policy_type=policy.type.value,
-                        status=EvaluationStatus.FAILED,
-                        score=1.0,
-                        confidence=0.0,
-                        violation=False,
-                        details={},
-                        execution_time_ms=execution_time,
-                        error_message=stderr.decode()
-                    ))
-                    
-            except Exception as e:
-                execution_time = (time.time() - start_time) * 1000
-                logger.error(f"Error evaluating with Rust: {e}")
+            plan = (
+                [g for g in groups.values() if g[0].type in RUST_POLICY_TYPES],
+                [g for g in groups.values() if g[0].type in PYTHON_POLICY_TYPES]
+            )
+            self._plan_cache[key] = plan
+        return plan
+    
+    @staticmethod
+    def _fan_out(results: List[PolicyEvaluationResult], groups: PolicyGroups) -> List[PolicyEvaluationResult]:
+        """Copy each group's result to the other policies in the group"""
+        expanded = []
+        for result, group in zip(results, groups):
+            expanded.append(result)
+            expanded.extend(
+                result.model_copy(update={"policy_id": str(p.id), "policy_name": p.name})
+                for p in group[1:]
+            )
+        return expanded
+    
+    @staticmethod
+    def _is_critical(result: PolicyEvaluationResult) -> bool:
+        return result.violation and result.score < 0.3
+    
+    async def _evaluate_with_rust(
+        self, 
+        content: str, 
+        policies: List[Policy],
+        stop_on_critical: bool = False
+    ) -> List[PolicyEvaluationResult]:
+        """Evaluate content using the Rust evaluator for fast policies"""
+        if not policies:
+            return []
+        
+        start_ns = time.perf_counter_ns()
+        try:
+            # One round-trip to the long-lived Rust evaluator for all policies
+            batch = await self.rust_evaluator.evaluate_batch(content, policies, stop_on_critical)
+        except Exception as e:
+            logger.error(f"Error evaluating with Rust: {e}")
+            batch = [{"error": str(e)}] * len(policies)
+        execution_time = (time.perf_counter_ns() - start_ns) / 1_000_000
+        
+        results = []
+        for policy, result_data in zip(policies, batch):
+            if result_data.get("error"):
                 results.append(PolicyEvaluationResult(
                     policy_id=str(policy.id),
                     policy_name=policy.name,
@@ -174,70 +204,108 @@ class EvaluationService:
                     violation=False,
                     details={},
                     execution_time_ms=execution_time,
-                    error_message=str(e)
+                    error_message=result_data["error"]
                 ))
-        
-        return results
-    
-    async def _evaluate_with_python(self, content: str, policies: List[Policy]) -> List[PolicyEvaluationResult]:
-        """Evaluate content using Python ML evaluators"""
-        results = []
-        
-        for policy in policies:
-            start_time = time.time()
-            
-            try:
-                if policy.type == PolicyType.CONTENT_SAFETY:
-                    result = await self.content_safety_evaluator.evaluate(content, policy.config)
-                    
-                    results.append(PolicyEvaluationResult(
-                        policy_id=str(policy.id),
-                        policy_name=policy.name,
-                        policy_type=policy.type.value,
-                        status=EvaluationStatus.COMPLETED,
-                        score=result["score"],
-                        confidence=result["confidence"],
-                        violation=result["violation"],
-                        details=result["details"],
-                        execution_time_ms=(time.time() - start_time) * 1000
-                    ))
-                    
-                elif policy.type == PolicyType.SEMANTIC:
-                    # Placeholder for semantic evaluator
-                    results.append(PolicyEvaluationResult(
-                        policy_id=str(policy.id),
-                        policy_name=policy.name,
-                        policy_type=policy.type.value,
-                        status=EvaluationStatus.COMPLETED,
-                        score=0.9,
-                        confidence=0.8,
-                        violation=False,
-                        details={"similarity_scores": []},
-                        execution_time_ms=(time.time() - start_time) * 1000
-                    ))
-                    
-            except Exception as e:
-                execution_time = (time.time() - start_time) * 1000
-                logger.error(f"Error evaluating with Python: {e}")
+            else:
                 results.append(PolicyEvaluationResult(
                     policy_id=str(policy.id),
                     policy_name=policy.name,
                     policy_type=policy.type.value,
-                    status=EvaluationStatus.FAILED,
-                    score=1.0,
-                    confidence=0.0,
-                    violation=False,
-                    details={},
-                    execution_time_ms=execution_time,
-                    error_message=str(e)
+                    status=EvaluationStatus.COMPLETED,
+                    score=result_data.get("score", 1.0),
+                    confidence=result_data.get("confidence", 1.0),
+                    violation=result_data.get("violation", False),
+                    details=result_data.get("details", {}),
+                    execution_time_ms=execution_time
                 ))
+            
+            if stop_on_critical and self._is_critical(results[-1]):
+                self._critical_hits[str(policy.id)] = self._critical_hits.get(str(policy.id), 0) + 1
+                break
         
         return results
     
+    async def _evaluate_with_python(self, request: EvaluationRequest, policies: List[Policy]) -> List[PolicyEvaluationResult]:
+        """Evaluate content using Python ML evaluators, policies concurrently"""
+        content_digest = hashlib.blake2b(request.content.encode(), digest_size=16).digest()
+        semaphore = asyncio.Semaphore(PYTHON_EVALUATION_CONCURRENCY)
+        
+        async def bounded(policy: Policy) -> PolicyEvaluationResult:
+            async with semaphore:
+                return await self._evaluate_one_python(request, content_digest, policy)
+        
+        return list(await asyncio.gather(*(bounded(policy) for policy in policies)))
+    
+    async def _evaluate_one_python(
+        self,
+        request: EvaluationRequest,
+        content_digest: bytes,
+        policy: Policy
+    ) -> PolicyEvaluationResult:
+        start_ns = time.perf_counter_ns()
+        
+        try:
+            if policy.type == PolicyType.CONTENT_SAFETY:
+                cache_key = (content_digest, str(policy.id), policy.version, policy.updated_at)
+                cached = self._eval_cache.get(cache_key)
+                if cached is not None:
+                    return cached.model_copy(update={
+                        "policy_name": policy.name,
+                        "execution_time_ms": (time.perf_counter_ns() - start_ns) / 1_000_000
+                    })
+                
+                evaluation = (await self.content_safety_evaluator.evaluate(request, policy)).result
+                if evaluation.error:
+                    # Failures are not cached, so the next request retries
+                    raise RuntimeError(evaluation.error)
+                
+                policy_result = PolicyEvaluationResult(
+                    policy_id=str(policy.id),
+                    policy_name=policy.name,
+                    policy_type=policy.type.value,
+                    status=EvaluationStatus.COMPLETED,
+                    score=CONTENT_SAFETY_SEVERITY_SCORES.get(evaluation.severity, 0.5) if evaluation.violation else 1.0,
+                    confidence=evaluation.confidence,
+                    violation=evaluation.violation,
+                    details=evaluation.details or {},
+                    execution_time_ms=(time.perf_counter_ns() - start_ns) / 1_000_000
+                )
+                self._eval_cache[cache_key] = policy_result
+                return policy_result
+            
+            # Placeholder for semantic evaluator
+            return PolicyEvaluationResult(
+                policy_id=str(policy.id),
+                policy_name=policy.name,
+                policy_type=policy.type.value,
+                status=EvaluationStatus.COMPLETED,
+                score=0.9,
+                confidence=0.8,
+                violation=False,
+                details={"similarity_scores": []},
+                execution_time_ms=(time.perf_counter_ns() - start_ns) / 1_000_000
+            )
+                
+        except Exception as e:
+            execution_time = (time.perf_counter_ns() - start_ns) / 1_000_000
+            logger.error(f"Error evaluating with Python: {e}")
+            return PolicyEvaluationResult(
+                policy_id=str(policy.id),
+                policy_name=policy.name,
+                policy_type=policy.type.value,
+                status=EvaluationStatus.FAILED,
+                score=1.0,
+                confidence=0.0,
+                violation=False,
+                details={},
+                execution_time_ms=execution_time,
+                error_message=str(e)
+            )
+    
     async def _store_evaluation_result(self, result: EvaluationResult):
         """Store evaluation result in database"""
         try:
-            result_dict = result.dict()
+            result_dict = result.model_dump()
             await self.db.evaluation_results.insert_one(result_dict)
         except Exception as e:
             logger.error(f"Failed to store evaluation result: {e}")
@@ -1,73 +1,377 @@
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple, Type, TypeVar, AsyncIterator
 from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError
 from datetime import datetime
+import asyncio
+from functools import lru_cache
+import base64
+import orjson
+from cachetools import TTLCache
+from pydantic import TypeAdapter
 import logging
 
+from ..core.cache import (
+    cache_get,
+    cache_get_many,
+    cache_set,
+    claim_policy_change,
+    invalidate_policy_cache,
+    policy_cache_generation,
+    policy_cache_key,
+    versioned_policy_cache_key,
+    publish_policy_invalidation,
+    POLICY_CACHE_TTL_SECONDS
+)
 from ..database.mongodb import get_database
-from ..models.policy import Policy, PolicyCreate, PolicyUpdate, PolicyStatus
+from ..models.policy import (
+    BulkPolicyError,
+    BulkPolicyResult,
+    Policy,
+    PolicyCreate,
+    PolicyUpdate,
+    PolicyStatus,
+    PolicySummary
+)
 
 logger = logging.getLogger(__name__)
 
+# Fields the evaluators read from active policies, plus the ones Policy requires
+# and the page cursor needs; everything else is left on the server
+ACTIVE_POLICY_PROJECTION = {
+    "name": 1,
+    "type": 1,
+    "status": 1,
+    "config": 1,
+    "version": 1,
+    "updated_at": 1,
+    "created_at": 1,
+    "organization_id": 1,
+    "created_by": 1
+}
+
+# Exactly the PolicySummary fields, so list pages leave config and tags on
+# the server
+POLICY_SUMMARY_PROJECTION = {
+    "name": 1,
+    "description": 1,
+    "type": 1,
+    "status": 1,
+    "organization_id": 1,
+    "created_at": 1,
+    "updated_at": 1,
+    "version": 1
+}
+
+# Documents per cursor round trip when streaming listings
+STREAM_BATCH_SIZE = 200
+
+# Startup preheat: the most recently changed organizations, no more than the
+# worker's active-policy cache holds, loaded a few at a time
+PREHEAT_MAX_ORGANIZATIONS = 1024
+PREHEAT_CONCURRENCY = 8
+
+# PolicyUpdate fields a client may set to null; nulls for the others are ignored
+NULLABLE_POLICY_FIELDS = {"description"}
+
+# Built once: parses and encodes cached active-policy lists in a single
+# pydantic-core pass instead of one model call per policy
+POLICY_LIST_ADAPTER = TypeAdapter(List[Policy])
+
+PolicyModel = TypeVar("PolicyModel", Policy, PolicySummary)
+
+# (created_at, _id) of the last policy on a page
+PolicyCursor = Tuple[datetime, ObjectId]
+
+def _policy_key(organization_id: str, generation: str, policy_id: str) -> str:
+    return policy_cache_key(organization_id, generation, "id", policy_id)
+
+@lru_cache(maxsize=8192)
+def _object_id(policy_id: str) -> ObjectId:
+    """Parse a policy id once per process; ObjectId is immutable, so instances are shared"""
+    return ObjectId(policy_id)
+
+def encode_policy_cursor(cursor: PolicyCursor) -> str:
+    """Opaque page token for API clients"""
+    created_at, policy_id = cursor
+    return base64.urlsafe_b64encode(orjson.dumps([created_at.isoformat(), str(policy_id)])).decode()
+
+def decode_policy_cursor(token: str) -> PolicyCursor:
+    """Parse a page token; raises ValueError when it is malformed"""
+    try:
+        created_at, policy_id = orjson.loads(base64.urlsafe_b64decode(token.encode()))
+        return datetime.fromisoformat(created_at), ObjectId(policy_id)
+    except (ValueError, TypeError, InvalidId) as e:
+        raise ValueError(f"Invalid page cursor: {token}") from e
+
 class PolicyService:
     def __init__(self):
         self.db = get_database()
         self.collection = self.db.policies
+        # organization_id -> active policies; invalidated on every mutation
+        self._active_policies_cache: TTLCache = TTLCache(maxsize=1024, ttl=15)
 
     async def create_policy(self, policy_data: PolicyCreate, organization_id: str, user_id: str) -> Policy:
         """Create a new policy"""
-        policy_dict = policy_data.dict()
+        policy_dict = self._new_policy_doc(policy_data, organization_id, user_id)
+        
+        result = await self.collection.insert_one(policy_dict)
+        policy_dict["id"] = str(result.inserted_id)
+        await self._invalidate(organization_id)
+        
+        logger.info(f"Created policy {policy_dict['name']} for organization {organization_id}")
+        return Policy(**policy_dict)
+
+    async def bulk_create_policies(
+        self, 
+        policies_data: List[PolicyCreate], 
+        organization_id: str, 
+        user_id: str
+    ) -> BulkPolicyResult:
+        """Create many policies with a single insert_many.
+
+        Inserts are unordered, so one rejected policy does not stop the rest;
+        each rejection is reported by its index in policies_data.
+        """
+        if not policies_data:
+            return BulkPolicyResult()
+        
+        policy_dicts = [self._new_policy_doc(p, organization_id, user_id) for p in policies_data]
+        errors: List[BulkPolicyError] = []
+        try:
+            # Unordered, so the server may apply the inserts in parallel
+            await self.collection.insert_many(policy_dicts, ordered=False)
+        except BulkWriteError as e:
+            errors = [
+                BulkPolicyError(index=error["index"], message=error["errmsg"])
+                for error in e.details.get("writeErrors", [])
+            ]
+            if not errors:
+                # Only write concern errors; whether anything was saved is unknown
+                raise
+        finally:
+            # Whatever was inserted must not be hidden by stale caches
+            await self._invalidate(organization_id)
+        
+        failed = {error.index for error in errors}
+        created = []
+        for index, policy_dict in enumerate(policy_dicts):
+            if index not in failed:
+                policy_dict["id"] = str(policy_dict["_id"])
+                created.append(Policy(**policy_dict))
+        
+        logger.info(f"Created {len(created)} of {len(policy_dicts)} policies for organization {organization_id}")
+        return BulkPolicyResult(created=created, errors=errors)
+
+    @staticmethod
+    def _new_policy_doc(policy_data: PolicyCreate, organization_id: str, user_id: str) -> Dict[str, Any]:
+        now = datetime.utcnow()
+        policy_dict = policy_data.model_dump()
         policy_dict.update({
             "_id": ObjectId(),
             "organization_id": organization_id,
             "created_by": user_id,
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow(),
+            "created_at": now,
+            "updated_at": now,
             "version": 1,
             "status": PolicyStatus.DRAFT
         })
-        
-        result = await self.collection.insert_one(policy_dict)
-        policy_dict["id"] = str(result.inserted_id)
-        
-        logger.info(f"Created policy {policy_dict['name']} for organization {organization_id}")
-        return Policy(**policy_dict)
+        return policy_dict
 
     async def get_policy(self, policy_id: str, organization_id: str) -> Optional[Policy]:
-        """Get a policy by ID"""
+        """Get a policy by ID, read through the Redis cache"""
+        policy_json = await self.get_policy_json(policy_id, organization_id)
+        return Policy.model_validate_json(policy_json) if policy_json else None
+
+    async def get_policy_json(self, policy_id: str, organization_id: str) -> Optional[str]:
+        """Get a policy by ID as JSON, read through the Redis cache; cache hits
+        are returned as stored, without parsing"""
+        cache_key = await versioned_policy_cache_key(organization_id, "id", policy_id)
+        cached = await cache_get(cache_key)
+        if cached:
+            return cached
+        
         policy_doc = await self.collection.find_one({
-            "_id": ObjectId(policy_id),
+            "_id": _object_id(policy_id),
             "organization_id": organization_id
         })
         
         if policy_doc:
             policy_doc["id"] = str(policy_doc["_id"])
-            return Policy(**policy_doc)
+            policy_json = Policy(**policy_doc).model_dump_json()
+            await cache_set(cache_key, policy_json, POLICY_CACHE_TTL_SECONDS)
+            return policy_json
         return None
 
+    async def get_policies(self, policy_ids: List[str], organization_id: str) -> List[Policy]:
+        """Get several policies by ID in the given order, skipping missing ones.
+
+        IDs are canonicalised and deduplicated first, so "ABC…" and "abc…" share
+        one cache entry and one result. Cached policies come from one Redis MGET
+        and the rest from one $in query, instead of a round trip per ID.
+        """
+        canonical_ids = list(dict.fromkeys(str(_object_id(policy_id)) for policy_id in policy_ids))
+        generation = await policy_cache_generation(organization_id)
+        cache_keys = [_policy_key(organization_id, generation, policy_id) for policy_id in canonical_ids]
+        cached = await cache_get_many(cache_keys)
+        
+        found: Dict[str, Policy] = {
+            policy_id: Policy.model_validate_json(value)
+            for policy_id, value in zip(canonical_ids, cached) if value
+        }
+        missing = [policy_id for policy_id in canonical_ids if policy_id not in found]
+        
+        if missing:
+            policy_docs = await self.collection.find({
+                "_id": {"$in": [_object_id(policy_id) for policy_id in missing]},
+                "organization_id": organization_id
+            }).to_list(length=len(missing))
+            
+            fetched = []
+            for policy_doc in policy_docs:
+                policy_doc["id"] = str(policy_doc["_id"])
+                policy = Policy(**policy_doc)
+                found[policy.id] = policy
+                fetched.append(policy)
+            await asyncio.gather(*(
+                cache_set(_policy_key(organization_id, generation, p.id), p.model_dump_json(), POLICY_CACHE_TTL_SECONDS)
+                for p in fetched
+            ))
+        
+        return [found[policy_id] for policy_id in canonical_ids if policy_id in found]
+
     async def list_policies(
         self, 
         organization_id: str, 
         status: Optional[PolicyStatus] = None,
         policy_type: Optional[str] = None,
-        skip: int = 0,
+        after: Optional[PolicyCursor] = None,
+        limit: int = 100,
+        projection: Optional[Dict[str, int]] = None
+    ) -> Tuple[List[Policy], Optional[PolicyCursor]]:
+        """List policies newest first, one page after the given cursor.
+
+        Returns the page and the cursor of its last policy, or None when
+        there are no more pages.
+        """
+        return await self._find_page(Policy, projection, organization_id, status, policy_type, after, limit)
+
+    async def list_policy_summaries(
+        self, 
+        organization_id: str, 
+        status: Optional[PolicyStatus] = None,
+        policy_type: Optional[str] = None,
+        after: Optional[PolicyCursor] = None,
         limit: int = 100
-    ) -> List[Policy]:
-        """List policies with optional filtering"""
-        query = {"organization_id": organization_id}
-        
-        if status:
-            query["status"] = status
-        if policy_type:
-            query["type"] = policy_type
+    ) -> Tuple[List[PolicySummary], Optional[PolicyCursor]]:
+        """Like list_policies, but only fetches the fields list views show"""
+        return await self._find_page(
+            PolicySummary, POLICY_SUMMARY_PROJECTION, organization_id, status, policy_type, after, limit
+        )
+
+    async def _find_page(
+        self,
+        model: Type[PolicyModel],
+        projection: Optional[Dict[str, int]],
+        organization_id: str,
+        status: Optional[PolicyStatus],
+        policy_type: Optional[str],
+        after: Optional[PolicyCursor],
+        limit: int
+    ) -> Tuple[List[PolicyModel], Optional[PolicyCursor]]:
+        query = self._list_query(organization_id, status, policy_type)
+        if after:
+            # Seek past the previous page instead of skipping over it; _id
+            # breaks ties between policies created at the same instant
+            last_created_at, last_id = after
+            query["$or"] = [
+                {"created_at": {"$lt": last_created_at}},
+                {"created_at": last_created_at, "_id": {"$lt": last_id}}
+            ]
             
-        cursor = self.collection.find(query).skip(skip).limit(limit).sort("created_at", -1)
+        cursor = (
+            self.collection.find(query, projection)
+            .sort([("created_at", -1), ("_id", -1)])
+            .limit(limit)
+        )
+        # One await for the whole page rather than one per document
+        policy_docs = await cursor.to_list(length=limit)
+        
         policies = []
+        for policy_doc in policy_docs:
+            policy_doc["id"] = str(policy_doc["_id"])
+            policies.append(model(**policy_doc))
         
+        next_cursor = None
+        if len(policy_docs) == limit:
+            next_cursor = (policy_docs[-1]["created_at"], policy_docs[-1]["_id"])
+        return policies, next_cursor
+
+    async def stream_policy_summaries(
+        self, 
+        organization_id: str, 
+        status: Optional[PolicyStatus] = None,
+        policy_type: Optional[str] = None
+    ) -> AsyncIterator[bytes]:
+        """Yield every matching policy summary, newest first, as NDJSON lines.
+
+        Documents are encoded straight from the cursor without building
+        models, so memory stays at one cursor batch however many match.
+        """
+        cursor = (
+            self.collection.find(self._list_query(organization_id, status, policy_type), POLICY_SUMMARY_PROJECTION)
+            .sort([("created_at", -1), ("_id", -1)])
+            .batch_size(STREAM_BATCH_SIZE)
+        )
         async for policy_doc in cursor:
+            policy_doc["id"] = str(policy_doc.pop("_id"))
+            yield orjson.dumps(policy_doc) + b"\n"
+
+    async def list_policy_summaries_with_total(
+        self, 
+        organization_id: str, 
+        status: Optional[PolicyStatus] = None,
+        policy_type: Optional[str] = None,
+        page: int = 1,
+        limit: int = 100
+    ) -> Tuple[List[PolicySummary], int]:
+        """List one numbered page of policy summaries and the total match count.
+
+        Page and count come from a single $facet aggregation. Skipping is
+        linear in the page number, so this is for UIs that jump to page N;
+        sequential readers should use cursors via list_policy_summaries.
+        """
+        pipeline = [
+            {"$match": self._list_query(organization_id, status, policy_type)},
+            {"$facet": {
+                "results": [
+                    {"$sort": {"created_at": -1, "_id": -1}},
+                    {"$skip": (page - 1) * limit},
+                    {"$limit": limit},
+                    {"$project": POLICY_SUMMARY_PROJECTION}
+                ],
+                "total": [{"$count": "n"}]
+            }}
+        ]
+        doc = (await self.collection.aggregate(pipeline).to_list(length=1))[0]
+        
+        policies = []
+        for policy_doc in doc["results"]:
             policy_doc["id"] = str(policy_doc["_id"])
-            policies.append(Policy(**policy_doc))
-            
-        return policies
+            policies.append(PolicySummary(**policy_doc))
+        
+        total = doc["total"][0]["n"] if doc["total"] else 0
+        return policies, total
+
+    @staticmethod
+    def _list_query(organization_id: str, status: Optional[PolicyStatus], policy_type: Optional[str]) -> Dict[str, Any]:
+        query = {"organization_id": organization_id}
+        if status:
+            query["status"] = status
+        if policy_type:
+            query["type"] = policy_type
+        return query
 
     async def update_policy(
         self, 
@@ -75,44 +379,120 @@ class PolicyService:
         policy_update: PolicyUpdate, 
         organization_id: str
     ) -> Optional[Policy]:
-        """Update a policy"""
-        update_data = {k: v for k, v in policy_update.dict().items() if v is not None}
-        update_data["updated_at"] = datetime.utcnow()
-        
-        result = await self.collection.update_one(
-            {"_id": ObjectId(policy_id), "organization_id": organization_id},
-            {"$set": update_data}
-        )
-        
-        if result.modified_count:
+        """Update the fields set in the request; an explicit null clears a nullable field"""
+        update_data = {
+            field: value
+            for field, value in policy_update.model_dump(exclude_unset=True).items()
+            if value is not None or field in NULLABLE_POLICY_FIELDS
+        }
+        if not update_data:
+            # Nothing to change; skip the write and leave updated_at alone
             return await self.get_policy(policy_id, organization_id)
-        return None
+        
+        update_data["updated_at"] = datetime.utcnow()
+        return await self._find_and_update(policy_id, organization_id, {"$set": update_data})
 
     async def delete_policy(self, policy_id: str, organization_id: str) -> bool:
         """Delete a policy"""
         result = await self.collection.delete_one({
-            "_id": ObjectId(policy_id),
+            "_id": _object_id(policy_id),
             "organization_id": organization_id
         })
         
+        if result.deleted_count:
+            await self._invalidate(organization_id)
         return result.deleted_count > 0
 
     async def get_active_policies(self, organization_id: str) -> List[Policy]:
         """Get all active policies for an organization"""
-        return await self.list_policies(
-            organization_id=organization_id,
-            status=PolicyStatus.ACTIVE
-        )
+        # Worker-local cache first, then Redis (shared by all workers), then MongoDB
+        policies = self._active_policies_cache.get(organization_id)
+        if policies is None:
+            cache_key = await versioned_policy_cache_key(organization_id, "set", "active")
+            cached = await cache_get(cache_key)
+            if cached:
+                policies = POLICY_LIST_ADAPTER.validate_json(cached)
+            else:
+                policies, _ = await self.list_policies(
+                    organization_id=organization_id,
+                    status=PolicyStatus.ACTIVE,
+                    projection=ACTIVE_POLICY_PROJECTION
+                )
+                await cache_set(cache_key, POLICY_LIST_ADAPTER.dump_json(policies), POLICY_CACHE_TTL_SECONDS)
+            self._active_policies_cache[organization_id] = policies
+        return list(policies)
+    
+    async def preheat(
+        self,
+        limit: int = PREHEAT_MAX_ORGANIZATIONS,
+        concurrency: int = PREHEAT_CONCURRENCY
+    ):
+        """Load active policies for the organizations with the most recent
+        policy changes, so their first requests hit the caches"""
+        rows = await self.collection.aggregate([
+            {"$match": {"status": PolicyStatus.ACTIVE}},
+            {"$group": {"_id": "$organization_id", "updated_at": {"$max": "$updated_at"}}},
+            {"$sort": {"updated_at": -1}},
+            {"$limit": limit}
+        ]).to_list(length=limit)
+        
+        slots = asyncio.Semaphore(concurrency)
+        
+        async def load(organization_id: str):
+            async with slots:
+                await self.get_active_policies(organization_id)
+        
+        await asyncio.gather(*(load(row["_id"]) for row in rows))
+        logger.info(f"Preheated active policies for {len(rows)} organizations")
+
+    async def handle_policy_change(self, organization_id: str, change_id: str):
+        """Drop cached policies after a change seen in the database.
+
+        Every worker watches the change stream and clears its own cache; only
+        the worker that claims the change clears Redis.
+        """
+        self.invalidate_active_policies(organization_id)
+        if await claim_policy_change(change_id):
+            await invalidate_policy_cache(organization_id)
+
+    def invalidate_active_policies(self, organization_id: str):
+        """Drop this worker's cached active policies for an organization"""
+        self._active_policies_cache.pop(organization_id, None)
+
+    async def _invalidate(self, organization_id: str):
+        self.invalidate_active_policies(organization_id)
+        await invalidate_policy_cache(organization_id)
+        await publish_policy_invalidation(organization_id)
 
     async def toggle_policy_status(self, policy_id: str, organization_id: str) -> Optional[Policy]:
         """Toggle policy status between active and inactive"""
-        policy = await self.get_policy(policy_id, organization_id)
-        if not policy:
-            return None
-            
-        new_status = PolicyStatus.INACTIVE if policy.status == PolicyStatus.ACTIVE else PolicyStatus.ACTIVE
-        update = PolicyUpdate(status=new_status)
+        # Pipeline update: the status is read and flipped in a single atomic write
+        return await self._find_and_update(policy_id, organization_id, [{
+            "$set": {
+                "status": {
+                    "$cond": [
+                        {"$eq": ["$status", PolicyStatus.ACTIVE.value]},
+                        PolicyStatus.INACTIVE.value,
+                        PolicyStatus.ACTIVE.value
+                    ]
+                },
+                # Stamped by the server at write time, inside the same atomic update
+                "updated_at": "$$NOW"
+            }
+        }])
+    
+    async def _find_and_update(self, policy_id: str, organization_id: str, update) -> Optional[Policy]:
+        """Apply an update and return the updated policy in one round trip"""
+        policy_doc = await self.collection.find_one_and_update(
+            {"_id": _object_id(policy_id), "organization_id": organization_id},
+            update,
+            return_document=ReturnDocument.AFTER
+        )
         
-        return await self.update_policy(policy_id, update, organization_id)
+        if policy_doc:
+            await self._invalidate(organization_id)
+            policy_doc["id"] = str(policy_doc["_id"])
+            return Policy(**policy_doc)
+        return None
 
 policy_service = PolicyService()
\ No newline at end of file
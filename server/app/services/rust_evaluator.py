@@ -0,0 +1,138 @@
+import asyncio
+import itertools
+import logging
+from typing import Any, Dict, List, Optional
+import orjson
+
+from ..core.config import get_settings
+from ..models.policy import Policy
+
+logger = logging.getLogger(__name__)
+
+class RustEvaluatorError(Exception):
+    """The Rust evaluator rejected a request or is unavailable"""
+
+class RustEvaluatorClient:
+    """Client for a long-lived `sentinelai serve` process speaking JSON lines over stdin/stdout"""
+
+    def __init__(self, binary: Optional[str] = None, timeout: Optional[float] = None):
+        settings = get_settings()
+        self.binary = binary or settings.RUST_EVALUATOR_BIN
+        self.timeout = timeout or settings.EVALUATION_TIMEOUT_SECONDS
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._reader: Optional[asyncio.Task] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._ids = itertools.count()
+        self._write_lock: Optional[asyncio.Lock] = None
+        self._start_lock: Optional[asyncio.Lock] = None
+
+    async def evaluate_batch(
+        self,
+        content: str,
+        policies: List[Policy],
+        stop_on_critical: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Evaluate policies against one content in a single round-trip.
+
+        Returns one result (score, confidence, violation, details, error) per
+        policy, in order; with stop_on_critical the list ends at the first
+        critical result.
+        """
+        await self._ensure_started()
+
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+
+        try:
+            line = orjson.dumps({
+                "id": request_id,
+                "content": content,
+                "policies": [
+                    {"policy_type": policy.type.value, "config": policy.config}
+                    for policy in policies
+                ],
+                "stop_on_critical": stop_on_critical
+            }) + b"\n"
+
+            async with self._write_lock:
+                self._process.stdin.write(line)
+                await self._process.stdin.drain()
+            response = await asyncio.wait_for(future, self.timeout)
+        except asyncio.TimeoutError:
+            raise RustEvaluatorError(f"Rust evaluator timed out after {self.timeout}s")
+        finally:
+            self._pending.pop(request_id, None)
+
+        if "error" in response:
+            raise RustEvaluatorError(response["error"])
+        return response["results"]
+
+    async def close(self):
+        """Stop the evaluator process"""
+        if self._process and self._process.returncode is None:
+            self._process.stdin.close()
+            try:
+                await asyncio.wait_for(self._process.wait(), timeout=5)
+            except asyncio.TimeoutError:
+                self._process.kill()
+                await self._process.wait()
+        if self._reader:
+            self._reader.cancel()
+        self._process = None
+        self._reader = None
+
+    async def _ensure_started(self):
+        # Built lazily: the client is created at import time, before the loop runs
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+            self._write_lock = asyncio.Lock()
+
+        async with self._start_lock:
+            if self._process and self._process.returncode is None:
+                if not self._reader.done():
+                    return
+                self._process.kill()
+                await self._process.wait()
+
+            try:
+                self._process = await asyncio.create_subprocess_exec(
+                    self.binary, "serve",
+                    stdin=asyncio.subprocess.PIPE,
+                    stdout=asyncio.subprocess.PIPE,
+                    # One response line per content; sized so large batches
+                    # don't hit the default 64 KiB line limit
+                    limit=16 * 1024 * 1024
+                )
+            except FileNotFoundError as e:
+                raise RustEvaluatorError(
+                    f"Rust evaluator not found at {self.binary!r}; install sentinelai "
+                    f"(cargo install --path core) or set RUST_EVALUATOR_BIN"
+                ) from e
+            except OSError as e:
+                raise RustEvaluatorError(f"Failed to start Rust evaluator: {e}") from e
+
+            self._reader = asyncio.create_task(self._read_responses(self._process))
+            logger.info(f"Started Rust evaluator (pid {self._process.pid})")
+
+    async def _read_responses(self, process: asyncio.subprocess.Process):
+        try:
+            while True:
+                line = await process.stdout.readline()
+                if not line:
+                    break
+                try:
+                    response = orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    logger.error(f"Malformed Rust evaluator response: {line[:200]!r}")
+                    continue
+
+                future = self._pending.get(response.get("id"))
+                if future and not future.done():
+                    future.set_result(response)
+        finally:
+            # The process exited; fail whatever is still waiting so the next
+            # call restarts it
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(RustEvaluatorError("Rust evaluator exited"))
@@ -0,0 +1,34 @@
+import os
+
+# Gunicorn settings for the API server: `gunicorn -c gunicorn_conf.py main:app`
+
+bind = f"{os.environ.get('HOST', '0.0.0.0')}:{os.environ.get('PORT', '8000')}"
+
+def default_workers(cores: int, eval_pool_workers: int) -> int:
+    """One event loop per process, so requests spread across every core.
+
+    Each worker also starts eval_pool_workers ML processes with their own model
+    copies, so with the pool enabled the web workers get a core's share each.
+    """
+    if eval_pool_workers > 0:
+        return max(1, cores // (eval_pool_workers + 1))
+    return cores * 2 + 1
+
+workers = int(os.environ.get("WEB_CONCURRENCY") or default_workers(
+    os.cpu_count() or 1, int(os.environ.get("EVAL_POOL_WORKERS", "1"))
+))
+worker_class = "uvicorn.workers.UvicornWorker"
+keepalive = 5
+
+# The app is imported in each worker after the fork, so every worker runs its
+# own lifespan and holds its own MongoDB, Redis, and Rust evaluator
+# connections; sharing them across a fork is not safe
+preload_app = False
+
+# Workers load ML models on startup
+timeout = 120
+graceful_timeout = 30
+
+loglevel = os.environ.get("LOG_LEVEL", "info").lower()
+accesslog = "-"
+errorlog = "-"
@@ -1,27 +1,82 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
+from anyio import to_thread
+import asyncio
 import logging
-import os
+import orjson
 
-from app.database.mongodb import connect_to_mongo, close_mongo_connection
+from app.core.config import get_settings
+from app.database.mongodb import connect_to_mongo, close_mongo_connection, start_policy_change_watcher
+from app.core.cache import connect_to_redis, close_redis_connection, start_policy_invalidation_listener
+from app.services.policy_service import policy_service
+from app.services.evaluation_service import evaluation_service
+from app.services.eval_pool import create_eval_pool, shutdown_eval_pool
+from app.services.policy_engine import PolicyEngine
+from app.services.llm_proxy import LLMProxyService
 from app.api.v1 import chat, policies, evaluation
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Threads shared by sync endpoints, sync dependencies, and to_thread calls;
+# AnyIO's default of 40 queues requests under load
+THREADPOOL_TOKENS = 100
+
+async def _preheat_policies():
+    try:
+        await policy_service.preheat()
+    except Exception as e:
+        logger.warning(f"Failed to preheat policy caches: {e}")
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan events"""
     logger.info("Starting SentinelAI API server...")
     
+    to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_TOKENS
+    
     # Connect to MongoDB
     await connect_to_mongo()
     
+    # Connect to Redis and follow policy changes made by other workers
+    await connect_to_redis()
+    start_policy_invalidation_listener(policy_service.invalidate_active_policies)
+    start_policy_change_watcher(policy_service.handle_policy_change)
+    
+    # In the background, so startup does not wait on one query per organization
+    app.state.preheat = asyncio.create_task(_preheat_policies())
+    
+    # Shared services, created once and reused by every request
+    app.state.policy_engine = PolicyEngine()
+    app.state.llm_proxy = LLMProxyService()
+    app.state.pending_tasks = set()
+    
+    # Worker processes for comprehensive (ML) evaluation of responses
+    settings = get_settings()
+    app.state.eval_pool = create_eval_pool(settings.EVAL_POOL_WORKERS, chat.init_eval_worker)
+    
+    # Tokenizer that paces streaming policy checks
+    try:
+        await asyncio.to_thread(chat.preload_encodings)
+    except Exception as e:
+        logger.warning(f"Failed to preload tokenizers: {e}")
+    
     yield
     
-    # Close MongoDB connection
+    # Stop a preheat still running
+    app.state.preheat.cancel()
+    
+    # Let post-response evaluations started by streaming requests finish
+    if app.state.pending_tasks:
+        await asyncio.gather(*app.state.pending_tasks, return_exceptions=True)
+    await shutdown_eval_pool(app.state.eval_pool)
+    await evaluation_service.rust_evaluator.close()
+    
+    # Close Redis and MongoDB connections
+    await close_redis_connection()
     await close_mongo_connection()
     logger.info("Shutting down SentinelAI API server...")
 
@@ -29,9 +84,13 @@ app = FastAPI(
     title="SentinelAI API",
     description="Real-time AI governance and policy enforcement platform",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
+# No compression middleware: responses are compressed by the reverse proxy
+# (zstd/brotli), which is cheaper than compressing on the event loop here
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -39,6 +98,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count"],
 )
 
 # Include API routers
@@ -46,28 +106,35 @@ app.include_router(chat.router, prefix="/v1")
 app.include_router(policies.router, prefix="/v1")
 app.include_router(evaluation.router, prefix="/v1")
 
+# Static payloads, encoded once; health probes hit these several times a second
+_ROOT_BODY = orjson.dumps({"message": "SentinelAI API is running", "version": "1.0.0"})
+_HEALTH_BODY = orjson.dumps({"status": "healthy", "timestamp": "2024-01-01T00:00:00Z"})
+_STATUS_BODY = orjson.dumps({
+    "status": "operational",
+    "version": "1.0.0",
+    "features": {
+        "policy_management": True,
+        "content_evaluation": True,
+        "real_time_monitoring": True,
+        "multi_tenant": True
+    }
+})
+
 @app.get("/")
 async def root():
-    return {"message": "SentinelAI API is running", "version": "1.0.0"}
+    return Response(content=_ROOT_BODY, media_type="application/json")
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "timestamp": "2024-01-01T00:00:00Z"}
+    return Response(content=_HEALTH_BODY, media_type="application/json")
 
 @app.get("/v1/status")
 async def api_status():
     """API status endpoint"""
-    return {
-        "status": "operational",
-        "version": "1.0.0",
-        "features": {
-            "policy_management": True,
-            "content_evaluation": True,
-            "real_time_monitoring": True,
-            "multi_tenant": True
-        }
-    }
+    return Response(content=_STATUS_BODY, media_type="application/json")
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    settings = get_settings()
+    # uvloop and httptools ship with uvicorn[standard]
+    uvicorn.run(app, host=settings.HOST, port=settings.PORT, loop="uvloop", http="httptools")
\ No newline at end of file
@@ -0,0 +1,80 @@
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta
+
+import fakeredis.aioredis
+import pytest
+from bson import ObjectId
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from mongomock_motor import AsyncMongoMockClient
+
+# Tests import the app the way main.py does, from the server directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.cache import redis_cache
+from app.database.mongodb import mongodb
+
+# Services bind their collections when imported, so a database must exist first
+mongodb.database = AsyncMongoMockClient()["sentinelai_test"]
+
+@pytest.fixture
+def db():
+    """A fresh in-memory database, also handed to the policy service"""
+    from app.services.policy_service import policy_service
+    
+    database = AsyncMongoMockClient()["sentinelai_test"]
+    mongodb.database = database
+    policy_service.db = database
+    policy_service.collection = database.policies
+    policy_service._active_policies_cache.clear()
+    return database
+
+@pytest.fixture
+def redis():
+    """An in-memory Redis used through the app's cache helpers"""
+    # Its own server, so keys and generations never leak between tests
+    redis_cache.client = fakeredis.aioredis.FakeRedis(server=fakeredis.FakeServer(), decode_responses=True)
+    yield redis_cache.client
+    redis_cache.client = None
+
+@pytest.fixture
+def seed(db):
+    """Insert count active policies named policy-{i}, created a minute apart"""
+    def insert(count, organization_id="org1", created_at=None):
+        start = datetime(2024, 1, 1)
+        docs = [
+            {
+                "_id": ObjectId(),
+                "name": f"policy-{i}",
+                "description": "",
+                "type": "keyword_filter",
+                "status": "active",
+                "config": {},
+                "organization_id": organization_id,
+                "created_by": "user1",
+                "created_at": created_at or start + timedelta(minutes=i),
+                "updated_at": start,
+                "version": 1,
+                "tags": []
+            }
+            for i in range(count)
+        ]
+        asyncio.run(db.policies.insert_many(docs))
+        return docs
+    return insert
+
+@pytest.fixture
+def client(request, db):
+    """The policies API as user1 of an organization: org1, or the value given
+    with @pytest.mark.parametrize("client", [...], indirect=True)"""
+    from app.api.dependencies import get_current_user, get_organization_id
+    from app.api.v1 import policies
+
+    organization_id = getattr(request, "param", "org1")
+    app = FastAPI()
+    app.include_router(policies.router, prefix="/v1")
+    app.dependency_overrides[get_organization_id] = lambda: organization_id
+    app.dependency_overrides[get_current_user] = lambda: {"id": "user1"}
+    return TestClient(app)
@@ -0,0 +1,57 @@
+import asyncio
+
+from bson import ObjectId
+
+from app.core.cache import versioned_policy_cache_key
+from app.models.policy import PolicyCreate, PolicyUpdate
+from app.services.policy_service import policy_service
+
+active = policy_service.get_active_policies
+
+def test_active_policies_exclude_other_statuses_and_organizations(db, seed):
+    draft = {**seed(1)[0], "_id": ObjectId(), "status": "draft"}
+    asyncio.run(db.policies.insert_one(draft))
+    seed(1, organization_id="other-org")
+
+    policies = asyncio.run(active("org1"))
+    assert len(policies) == 1
+    assert policies[0].organization_id == "org1"
+    assert policies[0].status == "active"
+
+def test_cached_in_the_worker_until_a_write_invalidates(db, seed):
+    docs = seed(2)
+
+    async def scenario():
+        assert len(await active("org1")) == 2
+        # A write behind the service's back is not seen while the entry is cached
+        await db.policies.delete_one({"_id": docs[0]["_id"]})
+        assert len(await active("org1")) == 2
+        await policy_service.update_policy(str(docs[1]["_id"]), PolicyUpdate(name="renamed"), "org1")
+        return await active("org1")
+
+    assert [p.name for p in asyncio.run(scenario())] == ["renamed"]
+
+def test_shared_through_redis_between_workers(db, seed, redis):
+    seed(2)
+
+    async def scenario():
+        await active("org1")
+        # Another worker: empty local cache, same Redis
+        policy_service._active_policies_cache.clear()
+        await db.policies.delete_many({})
+        return await active("org1")
+
+    assert len(asyncio.run(scenario())) == 2
+
+def test_create_invalidates_every_cache(seed, redis):
+    seed(1)
+
+    async def scenario():
+        await active("org1")
+        await policy_service.create_policy(
+            PolicyCreate(name="new", type="keyword_filter", config={"patterns": ["x"]}), "org1", "user1"
+        )
+        return await redis.exists(await versioned_policy_cache_key("org1", "set", "active"))
+
+    assert asyncio.run(scenario()) == 0
+    assert "org1" not in policy_service._active_policies_cache
@@ -0,0 +1,52 @@
+import asyncio
+import time
+
+import jwt
+import pytest
+from fastapi import HTTPException
+
+from app.api import dependencies
+from app.api.dependencies import JWT_ALGORITHM, JWT_SECRET, get_current_user
+
+@pytest.fixture(autouse=True)
+def clear_token_cache():
+    dependencies._token_cache.clear()
+    yield
+    dependencies._token_cache.clear()
+
+def bearer(**claims):
+    return "Bearer " + jwt.encode(claims, JWT_SECRET, algorithm=JWT_ALGORITHM)
+
+def authenticate(authorization):
+    return asyncio.run(get_current_user(authorization))
+
+def test_valid_token_returns_user():
+    user = authenticate(bearer(user_id="u1", organization_id="org1", exp=int(time.time()) + 60))
+    assert user["id"] == "u1"
+    assert user["organization_id"] == "org1"
+
+def test_token_with_audience_is_rejected():
+    with pytest.raises(HTTPException) as exc:
+        authenticate(bearer(user_id="u1", aud="other-service"))
+    assert exc.value.status_code == 401
+
+def test_token_with_non_numeric_iat_is_rejected():
+    with pytest.raises(HTTPException) as exc:
+        authenticate(bearer(user_id="u1", iat="yesterday"))
+    assert exc.value.status_code == 401
+
+def test_expired_token_is_rejected():
+    with pytest.raises(HTTPException) as exc:
+        authenticate(bearer(user_id="u1", exp=int(time.time()) - 10))
+    assert exc.value.status_code == 401
+
+def test_token_signed_with_another_secret_is_rejected():
+    token = jwt.encode({"user_id": "u1"}, "not-the-secret", algorithm=JWT_ALGORITHM)
+    with pytest.raises(HTTPException):
+        authenticate("Bearer " + token)
+
+def test_verified_token_is_served_from_cache():
+    authorization = bearer(user_id="u1", exp=int(time.time()) + 60)
+    first = authenticate(authorization)
+    assert len(dependencies._token_cache) == 1
+    assert authenticate(authorization) is first
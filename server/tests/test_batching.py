@@ -0,0 +1,117 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.evaluators.batching import MicroBatchQueue
+
+class RecordingQueue(MicroBatchQueue):
+    """Upper-cases contents, recording batch sizes and peak concurrency"""
+    
+    MAX_BATCH = 10
+    
+    def __init__(self, executor, max_in_flight=1, delay=0.0, release=None):
+        super().__init__(executor, max_in_flight)
+        self.delay = delay
+        self.release = release
+        self.batches = []
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+    
+    def _process(self, contents):
+        with self._lock:
+            self.batches.append(list(contents))
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            if self.release is not None and "slow" in contents:
+                self.release.wait(5)
+            time.sleep(self.delay)
+            if "boom" in contents:
+                raise ValueError("batch failed")
+            return [content.upper() for content in contents]
+        finally:
+            with self._lock:
+                self.active -= 1
+
+@pytest.fixture
+def executor():
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        yield pool
+
+def test_concurrent_requests_are_coalesced_up_to_max_batch(executor):
+    queue = RecordingQueue(executor)
+    
+    async def scenario():
+        return await asyncio.gather(*(queue.submit(f"item{i}") for i in range(13)))
+    
+    assert asyncio.run(scenario()) == [f"ITEM{i}" for i in range(13)]
+    assert sorted(len(batch) for batch in queue.batches) == [3, 10]
+
+def test_batches_run_concurrently_up_to_max_in_flight(executor):
+    queue = RecordingQueue(executor, max_in_flight=2, delay=0.2)
+    
+    async def scenario():
+        first = asyncio.ensure_future(queue.submit("a"))
+        await asyncio.sleep(0.05)
+        second = asyncio.ensure_future(queue.submit("b"))
+        await asyncio.sleep(0.05)
+        third = asyncio.ensure_future(queue.submit("c"))
+        return await asyncio.gather(first, second, third)
+    
+    assert asyncio.run(scenario()) == ["A", "B", "C"]
+    assert queue.peak == 2
+
+def test_single_slot_serializes_batches(executor):
+    queue = RecordingQueue(executor, max_in_flight=1, delay=0.05)
+    
+    async def scenario():
+        first = asyncio.ensure_future(queue.submit("a"))
+        await asyncio.sleep(0.02)
+        return await asyncio.gather(first, queue.submit("b"))
+    
+    asyncio.run(scenario())
+    assert queue.peak == 1
+
+def test_slow_batch_does_not_stall_later_requests(executor):
+    release = threading.Event()
+    queue = RecordingQueue(executor, max_in_flight=2, release=release)
+    
+    async def scenario():
+        slow = asyncio.ensure_future(queue.submit("slow"))
+        await asyncio.sleep(0.05)
+        fast = await asyncio.wait_for(queue.submit("fast"), timeout=1)
+        assert not slow.done()
+        release.set()
+        return fast, await slow
+    
+    assert asyncio.run(scenario()) == ("FAST", "SLOW")
+
+def test_batch_failure_reaches_every_caller_in_the_batch(executor):
+    queue = RecordingQueue(executor)
+    
+    async def scenario():
+        return await asyncio.gather(queue.submit("boom"), queue.submit("ok"), return_exceptions=True)
+    
+    results = asyncio.run(scenario())
+    assert all(isinstance(r, ValueError) for r in results)
+
+def test_sorting_by_length_keeps_results_with_their_callers(executor):
+    queue = RecordingQueue(executor)
+    queue.SORT_BY_LENGTH = True
+    
+    async def scenario():
+        return await asyncio.gather(*(queue.submit(text) for text in ["ccc", "a", "bb"]))
+    
+    assert asyncio.run(scenario()) == ["CCC", "A", "BB"]
+    assert queue.batches == [["a", "bb", "ccc"]]
+
+def test_queue_without_process_fails_at_construction(executor):
+    class Incomplete(MicroBatchQueue):
+        pass
+    
+    with pytest.raises(TypeError):
+        Incomplete(executor)
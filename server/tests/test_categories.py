@@ -0,0 +1,31 @@
+from app.evaluators.categories import match_categories
+
+ALL_CATEGORIES = ["hate_speech", "harassment", "violence", "self_harm"]
+
+def categories(content, enabled=ALL_CATEGORIES):
+    return [category for category, _ in match_categories(content, enabled)]
+
+def test_overlapping_self_harm_and_violence_are_both_reported():
+    assert sorted(categories("I want to kill myself")) == ["self_harm", "violence"]
+
+def test_overlapping_hate_speech_and_violence_are_both_reported():
+    assert sorted(categories("I will kill all humans")) == ["hate_speech", "violence"]
+
+def test_matching_ignores_case():
+    assert categories("SHUT UP already") == ["harassment"]
+
+def test_results_follow_config_order():
+    assert categories("I want to kill myself", ["violence", "self_harm"]) == ["violence", "self_harm"]
+
+def test_only_enabled_categories_are_checked():
+    assert categories("I want to kill myself", ["self_harm"]) == ["self_harm"]
+
+def test_unknown_categories_are_ignored():
+    assert categories("I want to kill myself", ["spam"]) == []
+
+def test_reports_first_listed_pattern_that_matches():
+    (category, pattern), = match_categories("please harm myself", ["self_harm"])
+    assert pattern == r'\b(cut|hurt|harm)\s+myself'
+
+def test_clean_content_has_no_matches():
+    assert match_categories("What a lovely day", ALL_CATEGORIES) == []
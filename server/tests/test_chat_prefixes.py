@@ -0,0 +1,33 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from app.api.v1 import chat
+
+def policy(updated_at, version=1):
+    return SimpleNamespace(id="p1", version=version, updated_at=updated_at)
+
+def test_prefix_hashes_change_when_a_policy_is_edited():
+    before = datetime(2024, 1, 1)
+    contents = ["hello", "world"]
+    original = chat._prefix_hashes("org1", [policy(before)], contents)
+    # update_policy leaves version alone and only moves updated_at
+    edited = chat._prefix_hashes("org1", [policy(before + timedelta(seconds=1))], contents)
+    assert original[-1] != edited[-1]
+
+def test_prefix_cleared_under_old_policy_is_rechecked_after_edit():
+    before = datetime(2024, 1, 2)
+    # Longer than the overlap kept from a cleared prefix
+    contents = ["first turn " * 100, "second turn"]
+    chat._cleared_prefixes.clear()
+    hashes = chat._prefix_hashes("org1", [policy(before)], contents[:1])
+    chat._cleared_prefixes[hashes[-1]] = True
+    
+    unchanged = chat._prefix_hashes("org1", [policy(before)], contents)
+    assert chat._content_to_evaluate(contents, unchanged) != " ".join(contents)
+    
+    edited = chat._prefix_hashes("org1", [policy(before + timedelta(minutes=1))], contents)
+    assert chat._content_to_evaluate(contents, edited) == " ".join(contents)
+
+def test_prefix_hashes_are_scoped_to_the_organization():
+    at = datetime(2024, 1, 3)
+    assert chat._prefix_hashes("org1", [policy(at)], ["x"]) != chat._prefix_hashes("org2", [policy(at)], ["x"])
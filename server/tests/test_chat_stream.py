@@ -0,0 +1,24 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.api.v1 import chat
+
+def collect(stream):
+    async def main():
+        return [frame async for frame in stream]
+    return asyncio.run(main())
+
+def test_tokenizer_failure_is_reported_in_the_stream(monkeypatch):
+    def broken_encoding(model):
+        raise RuntimeError("tokenizer download failed")
+    monkeypatch.setattr(chat, "_encoding_for_model", broken_encoding)
+
+    request = SimpleNamespace(model="gpt-4", stream=True)
+    user = SimpleNamespace(id="u1", organization_id="org1")
+    frames = collect(chat._stream_with_policy_check(
+        request, user, [], llm_proxy=None, policy_engine=None,
+        eval_pool=None, pending_tasks=set()
+    ))
+
+    assert len(frames) == 1
+    assert b"tokenizer download failed" in frames[0]
@@ -0,0 +1,91 @@
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from app.models.evaluation import EvaluationRequest
+from app.models.policy import Policy, PolicyType
+from app.services.evaluation_service import evaluation_service
+
+class FakeContentSafetyEvaluator:
+    """Records calls and answers like ContentSafetyEvaluator.evaluate"""
+
+    def __init__(self, violation=False, error=None):
+        self.calls = []
+        self.violation = violation
+        self.error = error
+
+    async def evaluate(self, request, policy):
+        self.calls.append((request.content, policy.id))
+        return SimpleNamespace(result=SimpleNamespace(
+            violation=self.violation,
+            severity="HIGH" if self.violation else None,
+            confidence=0.9,
+            details={"categories_checked": ["violence"]},
+            error=self.error
+        ))
+
+@pytest.fixture
+def evaluator(monkeypatch):
+    def install(**kwargs):
+        fake = FakeContentSafetyEvaluator(**kwargs)
+        monkeypatch.setattr(evaluation_service, "content_safety_evaluator", fake)
+        return fake
+    evaluation_service._eval_cache.clear()
+    yield install
+    evaluation_service._eval_cache.clear()
+
+def safety_policy(**fields):
+    return Policy(**{
+        "id": "p1",
+        "name": "Safety",
+        "type": PolicyType.CONTENT_SAFETY,
+        "config": {"toxicity_threshold": 0.7},
+        "organization_id": "org1",
+        "created_by": "user1",
+        "updated_at": datetime(2024, 1, 1),
+        **fields
+    })
+
+def evaluate(policy, content="some content"):
+    request = EvaluationRequest(content=content, organization_id="org1", user_id="user1")
+    return asyncio.run(evaluation_service._evaluate_with_python(request, [policy]))[0]
+
+def test_evaluator_result_is_mapped_onto_the_policy_result(evaluator):
+    evaluator(violation=True)
+    result = evaluate(safety_policy())
+    assert result.status == "completed"
+    assert result.violation
+    assert result.score == 0.2
+    assert result.confidence == 0.9
+    assert result.details == {"categories_checked": ["violence"]}
+
+def test_identical_evaluation_is_a_cache_hit(evaluator):
+    fake = evaluator()
+    first = evaluate(safety_policy())
+    second = evaluate(safety_policy(name="Renamed"))
+    assert len(fake.calls) == 1
+    assert second.score == first.score
+    assert second.policy_name == "Renamed"
+
+@pytest.mark.parametrize("change", [{"updated_at": datetime(2024, 2, 1)}, {"version": 2}])
+def test_changed_policy_misses_the_cache(evaluator, change):
+    fake = evaluator()
+    evaluate(safety_policy())
+    evaluate(safety_policy(**change))
+    assert len(fake.calls) == 2
+
+def test_other_content_misses_the_cache(evaluator):
+    fake = evaluator()
+    evaluate(safety_policy())
+    evaluate(safety_policy(), content="other content")
+    assert len(fake.calls) == 2
+
+def test_evaluator_errors_are_failed_and_not_cached(evaluator):
+    fake = evaluator(error="Evaluation failed: model unavailable")
+    result = evaluate(safety_policy())
+    assert result.status == "failed"
+    assert "model unavailable" in result.error_message
+    evaluate(safety_policy())
+    assert len(fake.calls) == 2
@@ -0,0 +1,46 @@
+import asyncio
+import os
+import time
+
+from app.services.eval_pool import create_eval_pool, shutdown_eval_pool
+
+def noop():
+    pass
+
+def test_disabled_pool_is_none():
+    assert create_eval_pool(0, noop) is None
+
+def test_pool_workers_are_spawned():
+    pool = create_eval_pool(2, noop)
+    try:
+        assert pool._max_workers == 2
+        assert pool._mp_context.get_start_method() == "spawn"
+        assert pool.submit(os.getpid).result(timeout=30) != os.getpid()
+    finally:
+        pool.shutdown()
+
+def test_shutdown_does_not_block_the_event_loop():
+    pool = create_eval_pool(1, noop)
+    pool.submit(os.getpid).result(timeout=30)  # worker is up
+    busy = pool.submit(time.sleep, 0.5)
+    while not busy.running():
+        time.sleep(0.01)
+
+    async def main():
+        ticks = 0
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+        ticker = asyncio.create_task(tick())
+        await shutdown_eval_pool(pool)
+        ticker.cancel()
+        return ticks
+
+    assert asyncio.run(main()) > 10
+    # Running evaluations still finish
+    assert busy.done() and not busy.cancelled()
+
+def test_shutdown_of_disabled_pool_is_a_no_op():
+    asyncio.run(shutdown_eval_pool(None))
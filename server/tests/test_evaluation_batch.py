@@ -0,0 +1,61 @@
+import asyncio
+from typing import List
+
+import orjson
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+from app.api.v1 import evaluation
+from app.api.v1.evaluation import EvaluateRequest
+from app.models.evaluation import EvaluationResult, EvaluationStatus
+
+def completed(content):
+    return EvaluationResult(
+        request_id=content,
+        status=EvaluationStatus.COMPLETED,
+        overall_score=1.0,
+        has_violations=False,
+        total_execution_time_ms=1.0
+    )
+
+def run_batch(monkeypatch, evaluate_content, contents):
+    monkeypatch.setattr(evaluation.evaluation_service, "evaluate_content", evaluate_content)
+    return asyncio.run(evaluation.evaluate_batch(
+        requests=[EvaluateRequest(content=content) for content in contents],
+        current_user={"id": "user1"},
+        organization_id="org1"
+    ))
+
+def test_failed_item_gets_a_failed_result(monkeypatch):
+    async def evaluate_content(content, **kwargs):
+        if content == "bad":
+            raise ValueError("evaluator crashed")
+        return completed(content)
+
+    response = run_batch(monkeypatch, evaluate_content, ["ok", "bad"])
+    assert response.status_code == 200
+    ok, bad = orjson.loads(response.body)
+    assert (ok["status"], ok["error_message"]) == ("completed", None)
+    assert bad["status"] == "failed"
+    assert bad["error_message"] == "Failed to evaluate batch item 1"
+    assert ObjectId.is_valid(bad["request_id"])
+
+def test_cancelled_item_cancels_the_batch(monkeypatch):
+    async def evaluate_content(content, **kwargs):
+        if content == "cancelled":
+            raise asyncio.CancelledError()
+        return completed(content)
+
+    with pytest.raises(asyncio.CancelledError):
+        run_batch(monkeypatch, evaluate_content, ["ok", "cancelled"])
+
+def test_batch_body_is_decoded_with_defaults():
+    requests = evaluation._decode_body(b'[{"content": "a"}, {"content": "b", "policy_ids": ["p1"]}]', List[EvaluateRequest])
+    assert [(r.content, r.policy_ids) for r in requests] == [("a", []), ("b", ["p1"])]
+
+@pytest.mark.parametrize("body", [b'{"content": "a"', b'[{"policy_ids": []}]', b'[{"content": 1}]'])
+def test_invalid_body_is_unprocessable(body):
+    with pytest.raises(HTTPException) as exc:
+        evaluation._decode_body(body, List[EvaluateRequest])
+    assert exc.value.status_code == 422
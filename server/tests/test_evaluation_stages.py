@@ -0,0 +1,143 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+from cachetools import TTLCache
+
+from app.services.evaluation_service import evaluation_service
+from app.services.policy_service import policy_service
+
+PASS = {"score": 1.0, "confidence": 1.0, "violation": False, "details": {}}
+CRITICAL = {"score": 0.0, "confidence": 1.0, "violation": True, "details": {"matched": "bad"}}
+
+class FakeRustEvaluator:
+    """Answers each evaluate_batch call with scripted per-policy results"""
+
+    def __init__(self, results):
+        self.results = results
+        self.calls = []
+
+    async def evaluate_batch(self, content, policies, stop_on_critical=False):
+        self.calls.append([policy.name for policy in policies])
+        results = [self.results.get(policy.name, PASS) for policy in policies]
+        if isinstance(results[0], Exception):
+            raise results[0]
+        if stop_on_critical:
+            for index, result in enumerate(results):
+                if result["violation"] and result["score"] < 0.3:
+                    return results[:index + 1]
+        return results
+
+@pytest.fixture
+def stages(db, monkeypatch):
+    python_calls = []
+
+    async def evaluate_with_python(request, policies):
+        python_calls.append([policy.name for policy in policies])
+        return []
+
+    async def store(result):
+        pass
+
+    monkeypatch.setattr(evaluation_service, "_evaluate_with_python", evaluate_with_python)
+    monkeypatch.setattr(evaluation_service, "_store_evaluation_result", store)
+    monkeypatch.setattr(evaluation_service, "_critical_hits", TTLCache(maxsize=2, ttl=3600))
+    evaluation_service._plan_cache.clear()
+
+    def install(results):
+        rust = FakeRustEvaluator(results)
+        monkeypatch.setattr(evaluation_service, "rust_evaluator", rust)
+        return rust, python_calls
+    return install
+
+def add_policy(db, name, policy_type="keyword_filter", config=None):
+    asyncio.run(db.policies.insert_one({
+        "_id": ObjectId(),
+        "name": name,
+        "description": "",
+        "type": policy_type,
+        "status": "active",
+        "config": config or {"patterns": [name]},
+        "organization_id": "org1",
+        "created_by": "user1",
+        "created_at": datetime(2024, 1, 1),
+        "updated_at": datetime(2024, 1, 1),
+        "version": 1,
+        "tags": []
+    }))
+
+def evaluate():
+    return asyncio.run(evaluation_service.evaluate_content("some content", "org1", "user1"))
+
+def test_rust_policies_are_sent_in_one_request(db, stages):
+    rust, python_calls = stages({})
+    add_policy(db, "a")
+    add_policy(db, "b")
+    add_policy(db, "safety", policy_type="content_safety", config={"toxicity_threshold": 0.7})
+
+    result = evaluate()
+    assert len(rust.calls) == 1
+    assert sorted(rust.calls[0]) == ["a", "b"]
+    assert python_calls == [["safety"]]
+    assert result.status == "completed"
+
+def test_critical_rust_result_skips_the_ml_stage(db, stages):
+    rust, python_calls = stages({"a": CRITICAL})
+    add_policy(db, "a")
+    add_policy(db, "safety", policy_type="content_safety", config={"toxicity_threshold": 0.7})
+
+    result = evaluate()
+    assert result.status == "blocked"
+    assert result.overall_score == 0.0
+    assert python_calls == []
+
+def test_policies_that_blocked_before_are_checked_first(db, stages):
+    rust, _ = stages({"a": CRITICAL})
+    add_policy(db, "a")
+    add_policy(db, "b")
+    evaluate()
+    evaluate()
+    # Listed newest first, then reordered once "a" has blocked
+    assert rust.calls == [["b", "a"], ["a", "b"]]
+
+def test_critical_hit_counts_are_bounded(db, stages):
+    stages({"a": CRITICAL, "b": CRITICAL, "c": CRITICAL})
+    for name in ("a", "b", "c"):
+        # One blocking policy at a time, so each run counts a new policy
+        asyncio.run(db.policies.delete_many({}))
+        policy_service._active_policies_cache.clear()
+        add_policy(db, name)
+        evaluate()
+    assert len(evaluation_service._critical_hits) == 2
+
+def test_rust_failure_marks_its_policies_failed(db, stages):
+    stages({"a": ConnectionError("evaluator exited")})
+    add_policy(db, "a")
+    result = evaluate()
+    assert [r.status for r in result.policy_results] == ["failed"]
+    assert result.policy_results[0].error_message == "evaluator exited"
+
+def test_policies_with_the_same_config_are_evaluated_once(db, stages):
+    rust, _ = stages({})
+    add_policy(db, "a", config={"patterns": ["shared"]})
+    add_policy(db, "b", config={"patterns": ["shared"]})
+
+    result = evaluate()
+    assert len(rust.calls[0]) == 1
+    assert sorted(r.policy_name for r in result.policy_results) == ["a", "b"]
+    assert len({r.policy_id for r in result.policy_results}) == 2
+
+def test_plan_is_rebuilt_when_a_policy_changes(db, stages):
+    rust, _ = stages({})
+    add_policy(db, "a", config={"patterns": ["shared"]})
+    add_policy(db, "b", config={"patterns": ["shared"]})
+    evaluate()
+
+    asyncio.run(db.policies.update_one(
+        {"name": "b"}, {"$set": {"config": {"patterns": ["own"]}, "updated_at": datetime(2024, 2, 1)}}
+    ))
+    # Written behind the service's back, so drop the cached policy set
+    policy_service._active_policies_cache.clear()
+    evaluate()
+    assert len(rust.calls[-1]) == 2
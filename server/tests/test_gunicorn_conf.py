@@ -0,0 +1,16 @@
+import importlib
+
+import gunicorn_conf
+
+def test_gunicorn_workers_share_cores_with_the_pool():
+    assert gunicorn_conf.default_workers(8, 0) == 17
+    assert gunicorn_conf.default_workers(8, 1) == 4
+    assert gunicorn_conf.default_workers(8, 3) == 2
+    assert gunicorn_conf.default_workers(2, 3) == 1
+
+def test_web_concurrency_overrides_the_default(monkeypatch):
+    monkeypatch.setenv("WEB_CONCURRENCY", "3")
+    assert importlib.reload(gunicorn_conf).workers == 3
+    monkeypatch.delenv("WEB_CONCURRENCY")
+    importlib.reload(gunicorn_conf)
+    assert not hasattr(gunicorn_conf, "worker_connections")
@@ -0,0 +1,63 @@
+import asyncio
+
+from app.services.policy_service import policy_service
+
+get_policies = policy_service.get_policies
+
+def ids(docs):
+    return [str(doc["_id"]) for doc in docs]
+
+def test_policies_come_back_in_request_order_without_missing_ones(seed):
+    docs = seed(3)
+    other = seed(1, organization_id="other-org")
+    requested = [ids(docs)[2], ids(other)[0], ids(docs)[0], "65a000000000000000000000"]
+
+    policies = asyncio.run(get_policies(requested, "org1"))
+    assert [p.id for p in policies] == [ids(docs)[2], ids(docs)[0]]
+
+def test_cached_policies_are_read_in_one_mget(db, seed, redis, monkeypatch):
+    docs = seed(3)
+    mgets = []
+    mget = redis.mget
+
+    async def counting_mget(*keys):
+        mgets.append(keys)
+        return await mget(*keys)
+
+    monkeypatch.setattr(redis, "mget", counting_mget)
+
+    async def scenario():
+        await get_policies(ids(docs)[:2], "org1")
+        # Cached now, so the database is not needed for these two
+        await db.policies.delete_many({"_id": {"$in": [doc["_id"] for doc in docs[:2]]}})
+        return await get_policies(ids(docs), "org1")
+
+    assert [p.id for p in asyncio.run(scenario())] == ids(docs)
+    assert len(mgets) == 2
+
+def test_duplicate_ids_return_the_policy_once(seed, redis):
+    docs = seed(2)
+    requested = [ids(docs)[1], ids(docs)[0], ids(docs)[1]]
+
+    async def scenario():
+        # Once from the database, then again from the cache
+        return await get_policies(requested, "org1"), await get_policies(requested, "org1")
+
+    for policies in asyncio.run(scenario()):
+        assert [p.id for p in policies] == [ids(docs)[1], ids(docs)[0]]
+
+def test_non_canonical_ids_share_the_canonical_cache_entry(db, seed, redis):
+    docs = seed(1)
+    canonical = ids(docs)[0]
+
+    async def scenario():
+        first = await get_policies([canonical.upper()], "org1")
+        keys = [key for key in (canonical, canonical.upper()) if await redis.exists(f"policy:org1:0:id:{key}")]
+        # Served from the cache without the database
+        await db.policies.delete_many({})
+        return first, keys, await get_policies([canonical.upper(), canonical], "org1")
+
+    first, keys, second = asyncio.run(scenario())
+    assert [p.id for p in first] == [canonical]
+    assert keys == [canonical]
+    assert [p.id for p in second] == [canonical]
@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+
+from app.models.policy import PolicyCreate
+from app.services.policy_service import policy_service
+
+@pytest.fixture
+def invalidated(monkeypatch):
+    organizations = []
+
+    async def invalidate(organization_id):
+        organizations.append(organization_id)
+
+    monkeypatch.setattr(policy_service, "_invalidate", invalidate)
+    return organizations
+
+@pytest.fixture(autouse=True)
+def unique_names(db):
+    # Names unique per organization, so a duplicate is rejected by the server
+    asyncio.run(db.policies.create_index([("organization_id", 1), ("name", 1)], unique=True))
+
+def create(name):
+    return {"name": name, "type": "keyword_filter", "config": {"patterns": ["x"]}}
+
+def test_bulk_create_returns_every_policy(client, db, invalidated):
+    response = client.post("/v1/policies/bulk", json=[create("a"), create("b")])
+    assert response.status_code == 200
+    assert [p["name"] for p in response.json()["created"]] == ["a", "b"]
+    assert response.json()["errors"] == []
+    assert invalidated == ["org1"]
+
+def test_partial_failure_reports_rejected_policies_and_invalidates(client, db, seed, invalidated):
+    seed(1)  # policy-0
+    response = client.post("/v1/policies/bulk", json=[create("a"), create("policy-0"), create("b")])
+
+    assert response.status_code == 207
+    body = response.json()
+    assert [p["name"] for p in body["created"]] == ["a", "b"]
+    assert [e["index"] for e in body["errors"]] == [1]
+    assert asyncio.run(db.policies.count_documents({"organization_id": "org1"})) == 3
+    assert invalidated == ["org1"]
+
+def test_caches_are_invalidated_when_the_insert_fails(db, invalidated, monkeypatch):
+    async def insert_many(*args, **kwargs):
+        raise ConnectionError("connection reset")
+
+    monkeypatch.setattr(policy_service.collection, "insert_many", insert_many)
+    with pytest.raises(ConnectionError):
+        asyncio.run(policy_service.bulk_create_policies([PolicyCreate(**create("a"))], "org1", "user1"))
+    assert invalidated == ["org1"]
@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+
+from app.core.cache import invalidate_policy_cache, POLICY_CACHE_TTL_SECONDS
+from app.services.policy_service import policy_service
+
+@pytest.fixture
+def redis_gets(redis, monkeypatch):
+    keys = []
+    get = redis.get
+
+    async def counting_get(key):
+        keys.append(key)
+        return await get(key)
+
+    monkeypatch.setattr(redis, "get", counting_get)
+    return keys
+
+def test_get_policy_reads_one_cached_entry_per_request(client, seed, redis_gets):
+    policy_id = str(seed(1)[0]["_id"])
+
+    miss = client.get(f"/v1/policies/{policy_id}")
+    hit = client.get(f"/v1/policies/{policy_id}")
+
+    assert miss.status_code == hit.status_code == 200
+    assert miss.json() == hit.json()
+    assert miss.json()["id"] == policy_id
+    assert redis_gets == ["policy:org1:gen", f"policy:org1:0:id:{policy_id}"] * 2
+
+def test_unknown_policy_is_not_found(client, db):
+    response = client.get("/v1/policies/65a000000000000000000000")
+    assert response.status_code == 404
+
+def test_active_policies_and_single_policies_have_separate_keys(seed, redis):
+    policy_id = str(seed(2)[0]["_id"])
+
+    async def scenario():
+        await policy_service.get_active_policies("org1")
+        await policy_service.get_policy_json(policy_id, "org1")
+        return sorted(await redis.keys("policy:org1:*"))
+
+    keys = asyncio.run(scenario())
+    assert "policy:org1:0:set:active" in keys
+    assert f"policy:org1:0:id:{policy_id}" in keys
+    assert all(key.startswith(("policy:org1:0:set:", "policy:org1:0:id:")) for key in keys)
+
+def test_list_pages_are_cached_under_the_set_namespace(client, seed, redis_gets):
+    seed(2)
+    assert client.get("/v1/policies/", params={"limit": 1}).status_code == 200
+    assert len(redis_gets) == 2
+    assert redis_gets[1].startswith("policy:org1:0:set:list:")
+
+def test_invalidation_moves_reads_to_a_new_generation(db, seed, redis):
+    policy_id = str(seed(1)[0]["_id"])
+
+    async def scenario():
+        await policy_service.get_policy_json(policy_id, "org1")
+        await db.policies.update_one({}, {"$set": {"name": "renamed"}})
+        await invalidate_policy_cache("org1")
+        policy = await policy_service.get_policy(policy_id, "org1")
+        # The old entry is left to its TTL rather than found and deleted
+        return policy, await redis.ttl(f"policy:org1:0:id:{policy_id}")
+
+    policy, old_ttl = asyncio.run(scenario())
+    assert policy.name == "renamed"
+    assert 0 < old_ttl <= POLICY_CACHE_TTL_SECONDS
@@ -0,0 +1,46 @@
+import asyncio
+
+import mongomock
+import pytest
+from pymongo.errors import OperationFailure
+
+from app.database import mongodb as mongodb_module
+from app.services.policy_service import policy_service
+
+@pytest.fixture
+def missing_indexes(monkeypatch):
+    """Make any hinted query fail, as MongoDB does when the hinted index does not exist"""
+    def hint(self, index):
+        raise OperationFailure("error processing query: planner returned error :: bad hint", code=2)
+
+    aggregate = mongomock.collection.Collection.aggregate
+
+    def unhinted_aggregate(self, pipeline, **kwargs):
+        if "hint" in kwargs:
+            hint(self, kwargs["hint"])
+        return aggregate(self, pipeline, **kwargs)
+
+    monkeypatch.setattr(mongomock.collection.Cursor, "hint", hint)
+    monkeypatch.setattr(mongomock.collection.Collection, "aggregate", unhinted_aggregate)
+
+def test_policy_listings_do_not_depend_on_indexes(seed, missing_indexes):
+    seed(3)
+
+    async def scenario():
+        page, _ = await policy_service.list_policy_summaries("org1", limit=2)
+        numbered, total = await policy_service.list_policy_summaries_with_total("org1", page=1, limit=2)
+        return page, numbered, total
+
+    page, numbered, total = asyncio.run(scenario())
+    assert len(page) == len(numbered) == 2
+    assert total == 3
+
+def test_policies_only_get_the_compound_list_indexes(db):
+    asyncio.run(mongodb_module.create_indexes())
+    indexes = asyncio.run(db.policies.index_information())
+    keys = sorted(list(index["key"]) for name, index in indexes.items() if name != "_id_")
+    assert keys == sorted([
+        mongodb_module.POLICY_LIST_INDEX,
+        mongodb_module.POLICY_STATUS_LIST_INDEX,
+        mongodb_module.POLICY_TYPE_LIST_INDEX
+    ])
@@ -0,0 +1,67 @@
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from app.services.policy_service import decode_policy_cursor, encode_policy_cursor
+
+def test_cursor_pages_walk_every_policy_once_newest_first(client, seed):
+    seed(5)
+    names, after = [], None
+    while True:
+        params = {"limit": 2, **({"after": after} if after else {})}
+        response = client.get("/v1/policies/", params=params)
+        assert response.status_code == 200
+        names += [p["name"] for p in response.json()]
+        after = response.headers.get("X-Next-Cursor")
+        if not after:
+            break
+    assert names == [f"policy-{i}" for i in range(4, -1, -1)]
+
+def test_cursor_breaks_created_at_ties_by_id(client, seed):
+    seed(3, created_at=datetime(2024, 1, 1))
+    first = client.get("/v1/policies/", params={"limit": 2})
+    second = client.get("/v1/policies/", params={"limit": 2, "after": first.headers["X-Next-Cursor"]})
+    ids = [p["id"] for p in first.json() + second.json()]
+    assert len(set(ids)) == 3
+
+def test_pages_are_scoped_to_the_organization(client, seed):
+    seed(2, organization_id="other-org")
+    assert client.get("/v1/policies/").json() == []
+
+@pytest.mark.parametrize("client", ["other-org"], indirect=True)
+def test_each_organization_reads_its_own_pages(client, seed):
+    seed(1)
+    seed(2, organization_id="other-org")
+    assert len(client.get("/v1/policies/").json()) == 2
+
+def test_skip_is_rejected_instead_of_ignored(client, seed):
+    seed(3)
+    response = client.get("/v1/policies/", params={"skip": 2, "limit": 1})
+    assert response.status_code == 422
+
+def test_malformed_cursor_is_a_bad_request(client, db):
+    assert client.get("/v1/policies/", params={"after": "not-a-cursor"}).status_code == 400
+
+def test_cursor_round_trips():
+    cursor = (datetime(2024, 5, 1, 12, 30), ObjectId())
+    assert decode_policy_cursor(encode_policy_cursor(cursor)) == cursor
+
+def test_numbered_page_returns_the_total(client, seed):
+    seed(5)
+    response = client.get("/v1/policies/", params={"page": 2, "limit": 2})
+    assert response.status_code == 200
+    assert [p["name"] for p in response.json()] == ["policy-2", "policy-1"]
+    assert response.headers["X-Total-Count"] == "5"
+    assert "X-Next-Cursor" not in response.headers
+
+def test_page_past_the_end_is_empty_with_the_total(client, seed):
+    seed(3)
+    response = client.get("/v1/policies/", params={"page": 3, "limit": 2})
+    assert response.json() == []
+    assert response.headers["X-Total-Count"] == "3"
+
+def test_page_and_cursor_together_are_rejected(client, seed):
+    seed(2)
+    cursor = client.get("/v1/policies/", params={"limit": 1}).headers["X-Next-Cursor"]
+    assert client.get("/v1/policies/", params={"page": 1, "after": cursor}).status_code == 400
@@ -0,0 +1,44 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from app.services.policy_service import policy_service
+
+def seed_organizations(db, seed, count):
+    for i in range(count):
+        docs = seed(1, organization_id=f"org{i}")
+        # org0 changed least recently, org{count-1} most recently
+        asyncio.run(db.policies.update_one(
+            {"_id": docs[0]["_id"]},
+            {"$set": {"updated_at": datetime(2024, 1, 1) + timedelta(hours=i)}}
+        ))
+
+def test_preheat_loads_the_most_recently_changed_organizations(db, seed, monkeypatch):
+    seed_organizations(db, seed, 5)
+    loaded = []
+
+    async def get_active_policies(organization_id):
+        loaded.append(organization_id)
+
+    monkeypatch.setattr(policy_service, "get_active_policies", get_active_policies)
+    asyncio.run(policy_service.preheat(limit=2))
+    assert sorted(loaded) == ["org3", "org4"]
+
+def test_preheat_caps_concurrent_loads(db, seed, monkeypatch):
+    seed_organizations(db, seed, 6)
+    running = peak = 0
+
+    async def get_active_policies(organization_id):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    monkeypatch.setattr(policy_service, "get_active_policies", get_active_policies)
+    asyncio.run(policy_service.preheat(concurrency=2))
+    assert peak == 2
+
+def test_preheat_fills_the_worker_cache(seed):
+    seed(2, organization_id="org1")
+    asyncio.run(policy_service.preheat())
+    assert len(policy_service._active_policies_cache["org1"]) == 2
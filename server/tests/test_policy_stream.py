@@ -0,0 +1,26 @@
+import orjson
+import pytest
+from mongomock_motor import AsyncCursor
+
+@pytest.fixture(autouse=True)
+def chainable_batch_size(monkeypatch):
+    # mongomock-motor does not chain batch_size; Motor returns the cursor itself
+    monkeypatch.setattr(AsyncCursor, "batch_size", lambda self, size: self, raising=False)
+
+def stream(client, **params):
+    response = client.get("/v1/policies/stream", params=params)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    return [orjson.loads(line) for line in response.content.splitlines()]
+
+def test_stream_yields_one_summary_per_line_newest_first(client, seed):
+    seed(3)
+    seed(1, organization_id="other-org")
+    lines = stream(client)
+    assert [line["name"] for line in lines] == ["policy-2", "policy-1", "policy-0"]
+    assert "config" not in lines[0]
+    assert isinstance(lines[0]["id"], str)
+
+def test_stream_applies_the_status_filter(client, seed):
+    seed(2)
+    assert stream(client, status="draft") == []
@@ -0,0 +1,37 @@
+import asyncio
+
+from app.models.policy import PolicyCreate, PolicyType
+from app.services.policy_service import POLICY_SUMMARY_PROJECTION, policy_service
+
+def create(name, description="", config=None):
+    return policy_service.create_policy(
+        PolicyCreate(name=name, description=description, type=PolicyType.KEYWORD_FILTER, config=config or {}),
+        organization_id="org1",
+        user_id="user1"
+    )
+
+def test_summaries_include_description_for_list_search(db):
+    async def scenario():
+        await create("PII", description="Blocks personal data", config={"patterns": ["x" * 1000]})
+        summaries, _ = await policy_service.list_policy_summaries("org1")
+        return summaries
+    
+    summary, = asyncio.run(scenario())
+    assert summary.name == "PII"
+    assert summary.description == "Blocks personal data"
+    assert not hasattr(summary, "config")
+
+def test_summary_projection_leaves_config_and_tags_on_the_server():
+    assert "description" in POLICY_SUMMARY_PROJECTION
+    assert "config" not in POLICY_SUMMARY_PROJECTION
+    assert "tags" not in POLICY_SUMMARY_PROJECTION
+
+def test_cleared_description_lists_as_null(db):
+    async def scenario():
+        await create("PII", description="Blocks personal data")
+        await db.policies.update_one({"name": "PII"}, {"$set": {"description": None}})
+        summaries, _ = await policy_service.list_policy_summaries("org1")
+        return summaries
+    
+    summary, = asyncio.run(scenario())
+    assert summary.description is None
@@ -0,0 +1,53 @@
+import asyncio
+
+from app.models.policy import PolicyStatus, PolicyUpdate
+from app.services.policy_service import policy_service
+
+def stored(db, doc):
+    return asyncio.run(db.policies.find_one({"_id": doc["_id"]}))
+
+def update(doc, organization_id="org1", **fields):
+    return asyncio.run(policy_service.update_policy(str(doc["_id"]), PolicyUpdate(**fields), organization_id))
+
+def test_update_changes_only_the_fields_set(db, seed):
+    doc = seed(1)[0]
+    policy = update(doc, name="renamed")
+    assert policy.name == "renamed"
+    assert stored(db, doc)["status"] == doc["status"]
+    assert stored(db, doc)["updated_at"] > doc["updated_at"]
+
+def test_explicit_null_clears_description_but_not_other_fields(db, seed):
+    doc = seed(1)[0]
+    asyncio.run(db.policies.update_one({"_id": doc["_id"]}, {"$set": {"description": "old"}}))
+    update(doc, description=None, name=None)
+    assert stored(db, doc)["description"] is None
+    assert stored(db, doc)["name"] == doc["name"]
+
+def test_empty_update_skips_the_write(db, seed):
+    doc = seed(1)[0]
+    policy = update(doc)
+    assert policy.name == doc["name"]
+    assert stored(db, doc)["updated_at"] == doc["updated_at"]
+
+def test_update_is_scoped_to_the_organization(db, seed):
+    doc = seed(1)[0]
+    assert update(doc, organization_id="other-org", name="renamed") is None
+    assert stored(db, doc)["name"] == doc["name"]
+
+def test_toggle_flips_status(seed):
+    doc = seed(1)[0]
+    toggle = lambda: asyncio.run(policy_service.toggle_policy_status(str(doc["_id"]), "org1"))
+    assert toggle().status == PolicyStatus.INACTIVE
+    assert toggle().status == PolicyStatus.ACTIVE
+
+def test_toggle_is_stamped_by_the_server_clock(seed, monkeypatch):
+    doc = seed(1)[0]
+    updates = []
+
+    async def find_and_update(policy_id, organization_id, update):
+        updates.append(update)
+
+    monkeypatch.setattr(policy_service, "_find_and_update", find_and_update)
+    asyncio.run(policy_service.toggle_policy_status(str(doc["_id"]), "org1"))
+    # The in-memory test database does not evaluate $$NOW, so check the pipeline
+    assert updates[0][0]["$set"]["updated_at"] == "$$NOW"
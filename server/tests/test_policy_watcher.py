@@ -0,0 +1,124 @@
+import asyncio
+import logging
+from types import SimpleNamespace
+
+import pytest
+from pymongo.errors import AutoReconnect, OperationFailure
+
+from app.core.cache import policy_cache_generation
+from app.database import mongodb as mongodb_module
+from app.database.mongodb import _watch_policy_changes, mongodb
+from app.services.policy_service import policy_service
+
+class FakeStream:
+    def __init__(self, changes):
+        self.changes = changes
+        self.resume_token = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for index, change in enumerate(self.changes):
+            self.resume_token = {"_data": f"token-{index}"}
+            yield change
+
+class FakePolicies:
+    """Each watch() call takes the next outcome: an exception to raise or changes to yield"""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def watch(self, pipeline, **kwargs):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return FakeStream(outcome)
+
+@pytest.fixture
+def policies(monkeypatch):
+    def install(*outcomes):
+        collection = FakePolicies(*outcomes)
+        monkeypatch.setattr(mongodb, "database", SimpleNamespace(policies=collection))
+        monkeypatch.setattr(mongodb_module, "POLICY_WATCH_RETRY_SECONDS", 0)
+        return collection
+    return install
+
+async def ignore(organization_id, change_id):
+    pass
+
+@pytest.mark.parametrize("code", [40573, 40415])
+def test_unsupported_change_streams_stop_the_watcher(policies, caplog, code):
+    collection = policies(OperationFailure("not supported", code=code))
+    with caplog.at_level(logging.WARNING):
+        asyncio.run(asyncio.wait_for(_watch_policy_changes(ignore), 1))
+    assert collection.calls == 1
+    assert len(caplog.records) == 1
+
+def test_transient_errors_are_retried(policies):
+    collection = policies(AutoReconnect("connection reset"), OperationFailure("not supported", code=40573))
+    asyncio.run(asyncio.wait_for(_watch_policy_changes(ignore), 1))
+    assert collection.calls == 2
+
+def test_changes_are_reported_by_organization(policies):
+    policies(
+        [
+            {"operationType": "update", "fullDocument": {"organization_id": "org1"}},
+            {"operationType": "delete", "fullDocumentBeforeChange": {"organization_id": "org2"}},
+            {"operationType": "delete"},
+        ],
+        OperationFailure("not supported", code=40573)
+    )
+    seen = []
+
+    async def handler(organization_id, change_id):
+        seen.append((organization_id, change_id))
+
+    asyncio.run(asyncio.wait_for(_watch_policy_changes(handler), 1))
+    assert seen == [("org1", "token-0"), ("org2", "token-1")]
+
+def test_handler_errors_do_not_stop_the_watcher(policies, caplog):
+    collection = policies(
+        [
+            {"operationType": "update", "fullDocument": {"organization_id": "org1"}},
+            {"operationType": "update", "fullDocument": {"organization_id": "org2"}},
+        ],
+        OperationFailure("not supported", code=40573)
+    )
+    seen = []
+
+    async def handler(organization_id, change_id):
+        if organization_id == "org1":
+            raise ValueError("boom")
+        seen.append(organization_id)
+
+    with caplog.at_level(logging.ERROR):
+        asyncio.run(asyncio.wait_for(_watch_policy_changes(handler), 1))
+    assert seen == ["org2"]
+    assert collection.calls == 2
+    assert "boom" in caplog.text
+
+def test_unexpected_stream_errors_are_retried(policies):
+    collection = policies(ValueError("bad event"), OperationFailure("not supported", code=40573))
+    asyncio.run(asyncio.wait_for(_watch_policy_changes(ignore), 1))
+    assert collection.calls == 2
+
+def test_policy_change_clears_redis_once_per_change(db, redis):
+    async def scenario():
+        policy_service._active_policies_cache["org1"] = []
+        await policy_service.handle_policy_change("org1", "token-0")
+        # Another worker seeing the same change leaves Redis alone
+        await policy_service.handle_policy_change("org1", "token-0")
+        await policy_service.handle_policy_change("org1", "token-1")
+        return await policy_cache_generation("org1")
+
+    assert asyncio.run(scenario()) == "2"
+    assert "org1" not in policy_service._active_policies_cache
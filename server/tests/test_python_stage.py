@@ -0,0 +1,72 @@
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from app.models.evaluation import EvaluationRequest
+from app.models.policy import Policy, PolicyType
+from app.services import evaluation_service as evaluation_module
+from app.services.evaluation_service import evaluation_service
+
+class SlowEvaluator:
+    """Takes longer for earlier policies, so completion order is reversed"""
+
+    def __init__(self, delays, failing=()):
+        self.delays = delays
+        self.failing = set(failing)
+        self.running = self.peak = 0
+
+    async def evaluate(self, request, policy):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await asyncio.sleep(self.delays[policy.id])
+            if policy.id in self.failing:
+                raise RuntimeError("model crashed")
+        finally:
+            self.running -= 1
+        return SimpleNamespace(result=SimpleNamespace(
+            violation=False, severity=None, confidence=0.9, details={}, error=None
+        ))
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    evaluation_service._eval_cache.clear()
+    yield
+    evaluation_service._eval_cache.clear()
+
+def safety_policy(policy_id):
+    return Policy(
+        id=policy_id,
+        name=f"Safety {policy_id}",
+        type=PolicyType.CONTENT_SAFETY,
+        config={"toxicity_threshold": 0.7},
+        organization_id="org1",
+        created_by="user1",
+        updated_at=datetime(2024, 1, 1)
+    )
+
+def run_stage(monkeypatch, evaluator, policy_ids):
+    monkeypatch.setattr(evaluation_service, "content_safety_evaluator", evaluator)
+    request = EvaluationRequest(content="some content", organization_id="org1", user_id="user1")
+    return asyncio.run(evaluation_service._evaluate_with_python(request, [safety_policy(p) for p in policy_ids]))
+
+def test_slow_policies_run_concurrently_and_keep_policy_order(monkeypatch):
+    evaluator = SlowEvaluator({"p1": 0.05, "p2": 0.01})
+    results = run_stage(monkeypatch, evaluator, ["p1", "p2"])
+    assert [r.policy_id for r in results] == ["p1", "p2"]
+    assert evaluator.peak == 2
+
+def test_concurrency_is_bounded(monkeypatch):
+    monkeypatch.setattr(evaluation_module, "PYTHON_EVALUATION_CONCURRENCY", 2)
+    evaluator = SlowEvaluator({f"p{i}": 0.01 for i in range(5)})
+    results = run_stage(monkeypatch, evaluator, [f"p{i}" for i in range(5)])
+    assert evaluator.peak == 2
+    assert [r.policy_id for r in results] == [f"p{i}" for i in range(5)]
+
+def test_failing_policy_is_failed_on_its_own(monkeypatch):
+    evaluator = SlowEvaluator({"p1": 0.01, "p2": 0.01}, failing=["p1"])
+    results = run_stage(monkeypatch, evaluator, ["p1", "p2"])
+    assert [r.status for r in results] == ["failed", "completed"]
+    assert results[0].error_message == "model crashed"
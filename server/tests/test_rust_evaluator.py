@@ -0,0 +1,106 @@
+import asyncio
+import stat
+import sys
+import textwrap
+
+import pytest
+
+from app.models.policy import Policy, PolicyType
+from app.services.rust_evaluator import RustEvaluatorClient, RustEvaluatorError
+
+# Stands in for `sentinelai serve`: one JSON request per line in, one response
+# per line out. The content picks the behaviour under test.
+FAKE_SERVE = textwrap.dedent("""\
+    import json, sys
+    for line in sys.stdin:
+        request = json.loads(line)
+        content = request["content"]
+        if content == "hang":
+            continue
+        if content == "exit":
+            sys.exit(1)
+        if content == "malformed":
+            reply = {"id": request["id"], "error": "Malformed evaluation request: missing field"}
+        else:
+            reply = {"id": request["id"], "results": [
+                {"score": 1.0, "confidence": 1.0, "violation": False, "details": {"length": len(content)}}
+                for _ in request["policies"]
+            ]}
+        sys.stdout.write(json.dumps(reply) + "\\n")
+        sys.stdout.flush()
+""")
+
+@pytest.fixture
+def binary(tmp_path):
+    path = tmp_path / "sentinelai"
+    path.write_text(f"#!{sys.executable}\n{FAKE_SERVE}")
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+    return str(path)
+
+def keyword_policy(**config):
+    return Policy(
+        name="Keywords",
+        type=PolicyType.KEYWORD_FILTER,
+        config={"patterns": ["bad"], **config},
+        organization_id="org1",
+        created_by="u1"
+    )
+
+def run(client, coro):
+    async def main():
+        try:
+            return await coro(client)
+        finally:
+            await client.close()
+    return asyncio.run(main())
+
+def test_round_trip_returns_one_result_per_policy(binary):
+    client = RustEvaluatorClient(binary)
+    results = run(client, lambda c: c.evaluate_batch("hello", [keyword_policy(), keyword_policy()]))
+    assert [r["details"]["length"] for r in results] == [5, 5]
+
+def test_timeout_drops_the_pending_request(binary):
+    client = RustEvaluatorClient(binary, timeout=0.2)
+
+    async def scenario(c):
+        with pytest.raises(RustEvaluatorError, match="timed out"):
+            await c.evaluate_batch("hang", [keyword_policy()])
+        assert c._pending == {}
+        # The process is still usable afterwards
+        return await c.evaluate_batch("ok", [keyword_policy()])
+
+    assert run(client, scenario)[0]["details"]["length"] == 2
+
+def test_error_reply_fails_the_request(binary):
+    client = RustEvaluatorClient(binary)
+    with pytest.raises(RustEvaluatorError, match="Malformed"):
+        run(client, lambda c: c.evaluate_batch("malformed", [keyword_policy()]))
+
+def test_unencodable_request_drops_the_pending_request(binary):
+    client = RustEvaluatorClient(binary)
+
+    async def scenario(c):
+        with pytest.raises(TypeError):
+            await c.evaluate_batch("hello", [keyword_policy(threshold=object())])
+        return c._pending
+
+    assert run(client, scenario) == {}
+
+def test_evaluator_restarts_after_exit(binary):
+    client = RustEvaluatorClient(binary)
+
+    async def scenario(c):
+        with pytest.raises(RustEvaluatorError, match="exited"):
+            await c.evaluate_batch("exit", [keyword_policy()])
+        first = c._process
+        results = await c.evaluate_batch("again", [keyword_policy()])
+        assert c._process is not first
+        assert first.returncode is not None
+        return results
+
+    assert run(client, scenario)[0]["details"]["length"] == 5
+
+def test_missing_binary_is_reported(tmp_path):
+    client = RustEvaluatorClient(str(tmp_path / "missing"))
+    with pytest.raises(RustEvaluatorError, match="RUST_EVALUATOR_BIN"):
+        run(client, lambda c: c.evaluate_batch("hello", [keyword_policy()]))
@@ -0,0 +1,26 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.evaluators.content_safety import ToxicityClassifier
+
+CONFIG = SimpleNamespace(id2label={0: "TOXIC"}, problem_type="multi_label_classification", num_labels=1)
+
+class FixedLogits(ToxicityClassifier):
+    def _forward(self, encoded):
+        return np.array([[0.0] for _ in encoded["input_ids"]])
+
+def tokenizer(texts, **kwargs):
+    return {"input_ids": [[1] for _ in texts]}
+
+def test_classifier_without_forward_fails_at_construction():
+    class Incomplete(ToxicityClassifier):
+        pass
+    
+    with pytest.raises(TypeError):
+        Incomplete(tokenizer, CONFIG)
+
+def test_multi_label_scores_are_sigmoids():
+    scores = FixedLogits(tokenizer, CONFIG)(["a", "b"])
+    assert scores == [[{"label": "TOXIC", "score": 0.5}], [{"label": "TOXIC", "score": 0.5}]]
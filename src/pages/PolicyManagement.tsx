@@ -11,10 +11,10 @@ import { Textarea } from '../components/ui/textarea'
 import { DropdownMenu, DropdownMenuContent, DropdownMenuItem, DropdownMenuTrigger } from '../components/ui/dropdown-menu'
 import { Switch } from '../components/ui/switch'
 import { Alert, AlertDescription } from '../components/ui/alert'
-import { sentinelAPI, Policy, PolicyCreate, mockPolicies } from '../services/api'
+import { sentinelAPI, Policy, PolicyCreate, PolicySummary, mockPolicies } from '../services/api'
 
 export function PolicyManagement() {
-  const [policies, setPolicies] = useState<Policy[]>([])
+  const [policies, setPolicies] = useState<PolicySummary[]>([])
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState<string | null>(null)
   const [searchTerm, setSearchTerm] = useState('')
@@ -36,7 +36,7 @@ export function PolicyManagement() {
       
       // Try to load from API, fallback to mock data
       try {
-        const data = await sentinelAPI.listPolicies()
+        const { policies: data } = await sentinelAPI.listPolicies()
         setPolicies(data)
       } catch (apiError) {
         console.warn('API not available, using mock data:', apiError)
@@ -161,7 +161,7 @@ export function PolicyManagement() {
   // Filter policies based on search and filters
   const filteredPolicies = policies.filter(policy => {
     const matchesSearch = policy.name.toLowerCase().includes(searchTerm.toLowerCase()) ||
-                         policy.description.toLowerCase().includes(searchTerm.toLowerCase())
+                         (policy.description ?? '').toLowerCase().includes(searchTerm.toLowerCase())
     const matchesStatus = statusFilter === 'all' || policy.status === statusFilter
     const matchesType = typeFilter === 'all' || policy.type === typeFilter
     
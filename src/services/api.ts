@@ -9,7 +9,7 @@ const API_BASE_URL = process.env.NODE_ENV === 'production'
 export interface Policy {
   id: string
   name: string
-  description: string
+  description: string | null
   type: 'keyword_filter' | 'performance' | 'content_safety' | 'semantic'
   status: 'active' | 'inactive' | 'draft'
   config: Record<string, any>
@@ -21,6 +21,12 @@ export interface Policy {
   tags: string[]
 }
 
+// Fields returned by policy listings; fetch a policy for its config and tags
+export type PolicySummary = Pick<
+  Policy,
+  'id' | 'name' | 'description' | 'type' | 'status' | 'organization_id' | 'created_at' | 'updated_at' | 'version'
+>
+
 export interface PolicyCreate {
   name: string
   description?: string
@@ -79,6 +85,14 @@ class SentinelAIAPI {
     endpoint: string,
     options: RequestInit = {}
   ): Promise<T> {
+    return (await this.makeRawRequest<T>(endpoint, options)).body
+  }
+
+  // Like makeRequest, but also returns the response headers (lowercased names)
+  private async makeRawRequest<T>(
+    endpoint: string,
+    options: RequestInit = {}
+  ): Promise<{ body: T; headers: Record<string, string> }> {
     try {
       // Use Blink's secure API proxy for backend calls
       const response = await blink.data.fetch({
@@ -96,7 +110,11 @@ class SentinelAIAPI {
         throw new Error(`API Error: ${response.status} - ${response.body?.error || 'Unknown error'}`)
       }
 
-      return response.body as T
+      const headers: Record<string, string> = {}
+      for (const [name, value] of Object.entries(response.headers ?? {})) {
+        headers[name.toLowerCase()] = String(value)
+      }
+      return { body: response.body as T, headers }
     } catch (error) {
       console.error('API Request failed:', error)
       throw error
@@ -111,20 +129,22 @@ class SentinelAIAPI {
     })
   }
 
+  // Pages are chained by cursor: pass the previous page's nextCursor as `after`
   async listPolicies(params?: {
     status?: string
     policy_type?: string
-    skip?: number
+    after?: string
     limit?: number
-  }): Promise<Policy[]> {
+  }): Promise<{ policies: PolicySummary[]; nextCursor: string | null }> {
     const searchParams = new URLSearchParams()
     if (params?.status) searchParams.append('status', params.status)
     if (params?.policy_type) searchParams.append('policy_type', params.policy_type)
-    if (params?.skip) searchParams.append('skip', params.skip.toString())
+    if (params?.after) searchParams.append('after', params.after)
     if (params?.limit) searchParams.append('limit', params.limit.toString())
 
     const query = searchParams.toString() ? `?${searchParams.toString()}` : ''
-    return this.makeRequest<Policy[]>(`/v1/policies/${query}`)
+    const { body, headers } = await this.makeRawRequest<PolicySummary[]>(`/v1/policies/${query}`)
+    return { policies: body, nextCursor: headers['x-next-cursor'] || null }
   }
 
   async getPolicy(policyId: string): Promise<Policy> {